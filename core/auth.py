@@ -97,12 +97,15 @@ def _ensure_user_schema() -> None:
         _add("status", "status     TEXT NOT NULL DEFAULT 'active'")
         _add("created_at", "created_at TEXT")
         _add("units", "units      TEXT DEFAULT ''")
-
-        c.execute("UPDATE users SET passhash   = COALESCE(passhash, '')")
-        c.execute("UPDATE users SET functions  = COALESCE(functions, '')")
-        c.execute("UPDATE users SET status     = COALESCE(status, 'active')")
-        c.execute("UPDATE users SET created_at = COALESCE(created_at, datetime('now'))")
-        c.execute("UPDATE users SET units      = COALESCE(units, '')")
+        # Ausdrucks-Index exakt wie in pending_count/list_pending_users (braucht die status-Spalte)
+        c.execute("CREATE INDEX IF NOT EXISTS idx_users_pending ON users(LOWER(COALESCE(status,'active')))")
+
+        # Nur echte NULL-Lücken schreiben, sonst wird jede Zeile (und jeder Index) neu geschrieben
+        c.execute("UPDATE users SET passhash   = '' WHERE passhash IS NULL")
+        c.execute("UPDATE users SET functions  = '' WHERE functions IS NULL")
+        c.execute("UPDATE users SET status     = 'active' WHERE status IS NULL")
+        c.execute("UPDATE users SET created_at = datetime('now') WHERE created_at IS NULL")
+        c.execute("UPDATE users SET units      = '' WHERE units IS NULL")
         cn.commit()
 
 
@@ -1,12 +1,11 @@
 from contextlib import contextmanager
 import os
 import sqlite3
-import shutil
 import logging
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Iterator, Optional
+from typing import Iterator, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +14,51 @@ BACKUP_DIR = os.getenv("GE_BACKUP_DIR", "DB_BCK")
 BACKUP_KEEP = int(os.getenv("GE_BACKUPS_KEEP", "7"))
 
 
+# Verbindungs-Tuning für langlebige Verbindungen (gilt pro Verbindung, nicht für conn())
+_CONN_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+)
+_WAL_ENABLED = False
+# Statement-Cache pro Verbindung: feste SQL-Texte werden nur einmal geparst
+STATEMENT_CACHE_SIZE = 256
+
+
+def _ensure_wal(cn: sqlite3.Connection) -> None:
+    """WAL ist in der DB-Datei persistent; Flag erst setzen, wenn SQLite 'wal' bestätigt."""
+    global _WAL_ENABLED
+    if _WAL_ENABLED:
+        return
+    try:
+        mode = cn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+    except sqlite3.OperationalError:
+        logger.warning("Could not enable WAL journal mode, retrying on next connect")
+        return
+    _WAL_ENABLED = (mode or "").lower() == "wal"
+
+
+def configure_connection(cn: sqlite3.Connection) -> None:
+    """Für gecachte/langlebige Verbindungen: WAL sicherstellen und Pragmas einmal setzen."""
+    _ensure_wal(cn)
+    for pragma in _CONN_PRAGMAS:
+        cn.execute(pragma)
+
+
+def schema_stamp(cn: sqlite3.Connection) -> Tuple[int, int]:
+    """(Inode der DB-Datei, PRAGMA schema_version) als Marke für Schema-Checks.
+
+    Jede Schemaänderung und jeder Restore über die Backup-API erhöht schema_version,
+    eine ausgetauschte Datei ändert die Inode.
+    """
+    try:
+        ino = os.stat(get_db_path()).st_ino
+    except OSError:
+        ino = 0
+    return ino, cn.execute("PRAGMA schema_version").fetchone()[0]
+
+
 def get_db_path() -> str:
     return str(Path(DB_PATH).expanduser().resolve())
 
@@ -27,7 +71,10 @@ def get_backup_dir() -> str:
 def conn() -> Iterator[sqlite3.Connection]:
     db_file = get_db_path()
     try:
-        cn = sqlite3.connect(db_file, check_same_thread=False)
+        cn = sqlite3.connect(
+            db_file, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE
+        )
+        _ensure_wal(cn)
     except Exception:
         logger.exception("Failed to connect to database at %s", db_file)
         raise
@@ -181,7 +228,13 @@ def backup_db() -> Optional[str]:
     timestamp = int(time.time())
     backup_file = backup_dir / f"{db_file.name}.bak_{timestamp}"
     try:
-        shutil.copy2(str(db_file), str(backup_file))
+        # Online-Backup-API: konsistenter Snapshot inkl. WAL-Inhalt, ohne Dateikopie
+        with conn() as cn:
+            dst = sqlite3.connect(str(backup_file))
+            try:
+                cn.backup(dst)
+            finally:
+                dst.close()
         logger.info("[Backup] Datenbank gesichert als: %s", backup_file)
     except Exception:
         logger.exception("[WARNUNG] Backup konnte nicht erstellt werden")
@@ -189,12 +242,18 @@ def backup_db() -> Optional[str]:
 
     # rotate
     try:
-        backups = sorted([p for p in backup_dir.iterdir() if p.is_file() and p.name.startswith(db_file.name)], key=lambda p: p.stat().st_mtime, reverse=True)
+        # scandir liefert stat() gecacht pro DirEntry -> ein Syscall je Datei
+        with os.scandir(backup_dir) as it:
+            backups = sorted(
+                (e for e in it if e.name.startswith(db_file.name) and e.is_file()),
+                key=lambda e: e.stat().st_mtime,
+                reverse=True,
+            )
         for old in backups[BACKUP_KEEP:]:
             try:
-                old.unlink()
+                os.unlink(old.path)
             except Exception:
-                logger.exception("Failed to remove old backup: %s", old)
+                logger.exception("Failed to remove old backup: %s", old.path)
     except Exception:
         logger.exception("Failed during backup rotation")
 
@@ -26,7 +26,7 @@ def _get_business_name() -> str:
     try:
         with conn() as cn:
             c = cn.cursor()
-            row = c.execute("SELECT value FROM meta WHERE key='business_name'").fetchone()
+            row = c.execute("SELECT value FROM meta WHERE key=?", ("business_name",)).fetchone()
         if row and (row[0] or "").strip():
             return row[0].strip()
     except Exception:
@@ -1,21 +1,26 @@
 # modules/admin/admin.py
+import csv
+import functools
+import io
+import os
 import streamlit as st
-import pandas as pd
-import shutil
+import sqlite3
+import threading
 import time
 import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, List, Dict, Tuple
+from typing import Iterator, Optional, List, Dict, Tuple
 
-from core.db import BACKUP_DIR, DB_PATH, conn
+from core.db import STATEMENT_CACHE_SIZE, configure_connection, get_backup_dir, get_db_path, schema_stamp
 from core.ui_theme import page_header, section_title
 from core.config import APP_NAME, APP_VERSION
 from core import auth  # für Pending-Registrierungen
-from core import auth as authmod
-from modules import inventur_db as invdb
 
-# Benutzer-UI (liegt in modules/admin/users_admin.py)
-from .users_admin import render_users_admin
+BACKUP_DIR = Path(get_backup_dir())
+DB_PATH = Path(get_db_path())
 
 # ---------------- Änderungsnotizen (Default) ----------------
 DEFAULT_CHANGELOG_NOTES = {
@@ -29,32 +34,132 @@ DEFAULT_CHANGELOG_NOTES = {
     ]
 }
 
+# ---------------- Gemeinsame Verbindung ----------------
+_ADMIN_CONN_LOCK = threading.RLock()
+
+@st.cache_resource(show_spinner=False)
+def _get_admin_conn() -> sqlite3.Connection:
+    """Eine langlebige Verbindung pro Prozess statt conn() je Abfrage."""
+    cn = sqlite3.connect(
+        str(DB_PATH), check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE
+    )
+    configure_connection(cn)
+    return cn
+
+@contextmanager
+def _admin_conn() -> Iterator[sqlite3.Connection]:
+    """Gemeinsame Verbindung, über einen Lock zwischen Sessions serialisiert."""
+    with _ADMIN_CONN_LOCK:
+        cn = _get_admin_conn()
+        try:
+            yield cn
+        except BaseException:
+            # auch st.rerun()/st.stop(): keine halbe Transaktion auf der geteilten Verbindung lassen
+            if cn.in_transaction:
+                cn.rollback()
+            raise
+        if cn.in_transaction:
+            cn.commit()
+
+@contextmanager
+def _use_conn(cn: Optional[sqlite3.Connection]) -> Iterator[sqlite3.Connection]:
+    """Übergebene Verbindung nutzen, sonst die gemeinsame holen."""
+    if cn is not None:
+        yield cn
+    else:
+        with _admin_conn() as own:
+            yield own
+
 # ---------------- Hilfsfunktionen / DB ----------------
-def _table_exists(c, name: str) -> bool:
-    return c.execute(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
-        (name,),
-    ).fetchone() is not None
-
-def _ensure_tables():
-    with conn() as cn:
+@functools.lru_cache(maxsize=1)
+def _known_tables() -> frozenset:
+    """Snapshot aller Tabellennamen (einmal pro Render, siehe render_admin)."""
+    with _admin_conn() as cn:
+        return frozenset(
+            r[0] for r in cn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        )
+
+# Interne Verwaltungstabellen (nicht in Übersicht/Export)
+_INTERNAL_TABLES = frozenset({"_counts"})
+
+def _user_tables() -> Tuple[str, ...]:
+    """Sortierte Fachtabellen ohne sqlite_* und interne Tabellen."""
+    return tuple(sorted(
+        t for t in _known_tables() if not t.startswith("sqlite_") and t not in _INTERNAL_TABLES
+    ))
+
+# Alle idempotenten DDL-Anweisungen als ein Skript (ein Aufruf statt fünf)
+_ADMIN_DDL = """
+    -- USERS (functions/status-basiert)
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username   TEXT NOT NULL UNIQUE,
+        email      TEXT,
+        first_name TEXT,
+        last_name  TEXT,
+        passhash   TEXT NOT NULL DEFAULT '',
+        functions  TEXT DEFAULT '',
+        status     TEXT NOT NULL DEFAULT 'active',
+        created_at TEXT
+    );
+    -- FUNKTIONSKATALOG (Basis)
+    CREATE TABLE IF NOT EXISTS functions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        description TEXT
+    );
+    -- FIXCOSTS, META, CHANGELOG
+    CREATE TABLE IF NOT EXISTS fixcosts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        amount REAL NOT NULL DEFAULT 0,
+        note TEXT,
+        is_active INTEGER NOT NULL DEFAULT 1
+    );
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+    CREATE TABLE IF NOT EXISTS changelog (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at TEXT NOT NULL,
+        version TEXT NOT NULL,
+        note TEXT NOT NULL
+    );
+    -- ISO-8601-Text sortiert lexikografisch = chronologisch -> Index nutzbar
+    CREATE INDEX IF NOT EXISTS idx_changelog_created ON changelog(created_at);
+"""
+
+# Zeilenzahlen per Trigger mitführen (COUNT(*) ist in SQLite ein Full-Scan)
+_COUNTED_TABLES = ("users", "fixcosts")
+# Tabellen anderer Module: Zähler nur, wenn die Tabelle beim Schema-Check schon existiert
+_OPTIONAL_COUNTED_TABLES = ("items", "inventur")
+
+def _counts_ddl(tables: Tuple[str, ...] = _COUNTED_TABLES) -> str:
+    parts = ["CREATE TABLE IF NOT EXISTS _counts (table_name TEXT PRIMARY KEY, cnt INTEGER NOT NULL DEFAULT 0);"]
+    for t in tables:
+        parts.append(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{t}_cnt_ins AFTER INSERT ON {t} "
+            f"BEGIN UPDATE _counts SET cnt = cnt + 1 WHERE table_name = '{t}'; END;"
+        )
+        parts.append(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{t}_cnt_del AFTER DELETE ON {t} "
+            f"BEGIN UPDATE _counts SET cnt = cnt - 1 WHERE table_name = '{t}'; END;"
+        )
+        # Startwert nur einmal setzen; danach halten die Trigger den Zähler aktuell
+        parts.append(f"INSERT OR IGNORE INTO _counts(table_name, cnt) SELECT '{t}', COUNT(*) FROM {t};")
+    return "\n".join(parts)
+
+def _ensure_tables(cn: Optional[sqlite3.Connection] = None):
+    with _use_conn(cn) as cn:
+        cn.executescript(_ADMIN_DDL)
+        existing = {r[0] for r in cn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        cn.executescript(_counts_ddl(
+            _COUNTED_TABLES + tuple(t for t in _OPTIONAL_COUNTED_TABLES if t in existing)
+        ))
         c = cn.cursor()
 
-        # --- USERS (functions/status-basiert) ---
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username   TEXT NOT NULL UNIQUE,
-                email      TEXT,
-                first_name TEXT,
-                last_name  TEXT,
-                passhash   TEXT NOT NULL DEFAULT '',
-                functions  TEXT DEFAULT '',
-                status     TEXT NOT NULL DEFAULT 'active',
-                created_at TEXT
-            )
-        """)
-        # Migration / Backfill
+        # --- USERS: Migration / Backfill ---
         c.execute("PRAGMA table_info(users)")
         user_cols = {row[1] for row in c.fetchall()}
         def _add(col, ddl):
@@ -65,18 +170,12 @@ def _ensure_tables():
         _add("status",     "status    TEXT NOT NULL DEFAULT 'active'")
         _add("created_at", "created_at TEXT")
 
-        c.execute("UPDATE users SET passhash  = COALESCE(passhash,'')")
-        c.execute("UPDATE users SET status    = COALESCE(status,'active')")
-        c.execute("UPDATE users SET created_at= COALESCE(created_at, datetime('now'))")
+        # Nur echte NULL-Lücken schreiben, sonst würde jede Zeile neu geschrieben
+        c.execute("UPDATE users SET passhash  = '' WHERE passhash IS NULL")
+        c.execute("UPDATE users SET status    = 'active' WHERE status IS NULL")
+        c.execute("UPDATE users SET created_at= datetime('now') WHERE created_at IS NULL")
 
-        # --- FUNKTIONSKATALOG (Basis) ---
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS functions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL UNIQUE,
-                description TEXT
-            )
-        """)
+        # --- FUNKTIONSKATALOG: Defaults ---
         have_funcs = c.execute("SELECT COUNT(*) FROM functions").fetchone()[0]
         if have_funcs == 0:
             defaults = [
@@ -86,113 +185,236 @@ def _ensure_tables():
                 ("Kassa", "Karten-/Barzahlungen (eigene Units)"),
                 ("Garderobe", "Garderobenabrechnung (eigene Units)"),
             ]
-            c.executemany(
-                "INSERT INTO functions(name, description) VALUES(?,?)",
-                defaults,
-            )
-
-        # --- FIXCOSTS, META, CHANGELOG ---
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS fixcosts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                amount REAL NOT NULL DEFAULT 0,
-                note TEXT,
-                is_active INTEGER NOT NULL DEFAULT 1
-            )
-        """)
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS meta (
-                key TEXT PRIMARY KEY,
-                value TEXT
-            )
-        """)
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS changelog (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                created_at TEXT NOT NULL,
-                version TEXT NOT NULL,
-                note TEXT NOT NULL
-            )
-        """)
+            _bulk_insert("functions", ("name", "description"), defaults, cn)
 
         cn.commit()
+    _known_tables.cache_clear()
 
-def _get_meta(key: str) -> Optional[str]:
-    with conn() as cn:
+def _get_meta(key: str, cn: Optional[sqlite3.Connection] = None) -> Optional[str]:
+    with _use_conn(cn) as cn:
         c = cn.cursor()
         row = c.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
         return row[0] if row else None
 
-def _set_meta(key: str, value: str):
-    with conn() as cn:
+# Upsert, der unveränderte Werte nicht neu schreibt (keine Dirty-Pages/WAL-Frames)
+_META_UPSERT_SQL = (
+    "INSERT INTO meta(key, value) VALUES(?,?) "
+    "ON CONFLICT(key) DO UPDATE SET value = excluded.value "
+    "WHERE meta.value IS NOT excluded.value"
+)
+
+def _set_meta(key: str, value: str, cn: Optional[sqlite3.Connection] = None):
+    with _use_conn(cn) as cn:
         c = cn.cursor()
-        c.execute("INSERT OR REPLACE INTO meta(key, value) VALUES(?,?)", (key, value))
+        c.execute(_META_UPSERT_SQL, (key, value))
         cn.commit()
 
-def _get_meta_many(keys: List[str]) -> Dict[str, Optional[str]]:
-    with conn() as cn:
-        c = cn.cursor()
-        out: Dict[str, Optional[str]] = {}
-        for k in keys:
-            r = c.execute("SELECT value FROM meta WHERE key=?", (k,)).fetchone()
-            out[k] = r[0] if r else None
+def _get_meta_many(keys: List[str], cn: Optional[sqlite3.Connection] = None) -> Dict[str, Optional[str]]:
+    """Alle Keys mit einer IN-Abfrage; fehlende Keys = None."""
+    out: Dict[str, Optional[str]] = {k: None for k in keys}
+    if not keys:
+        return out
+    with _use_conn(cn) as cn:
+        out.update(cn.execute(
+            f"SELECT key, value FROM meta WHERE key IN ({', '.join('?' * len(keys))})",
+            keys,
+        ).fetchall())
         return out
 
-def _set_meta_many(data: Dict[str, str]):
-    with conn() as cn:
-        c = cn.cursor()
-        for k, v in data.items():
-            c.execute("INSERT OR REPLACE INTO meta(key, value) VALUES(?,?)", (k, v))
+def _set_meta_many(data: Dict[str, str], cn: Optional[sqlite3.Connection] = None):
+    with _use_conn(cn) as cn:
+        # Explizite Schreibtransaktion: Sperre sofort holen, ein Commit für alle Keys
+        if not cn.in_transaction:
+            cn.execute("BEGIN IMMEDIATE")
+        cn.executemany(_META_UPSERT_SQL, list(data.items()))
         cn.commit()
 
-def _insert_changelog(version: str, notes: List[str]):
-    now = datetime.datetime.now().isoformat(timespec="seconds")
-    with conn() as cn:
-        c = cn.cursor()
-        rows = [(now, version, note) for note in notes]
-        c.executemany(
-            "INSERT INTO changelog(created_at, version, note) VALUES(?,?,?)",
-            rows,
-        )
+def _bulk_insert(
+    table: str,
+    cols: Tuple[str, ...],
+    rows: List[Tuple],
+    cn: Optional[sqlite3.Connection] = None,
+    chunk: int = 500,
+):
+    """executemany in Blöcken zu `chunk` Zeilen, alles in einer Schreibtransaktion."""
+    if not rows:
+        return
+    sql = f'INSERT INTO "{table}"({", ".join(cols)}) VALUES({", ".join("?" * len(cols))})'
+    with _use_conn(cn) as cn:
+        # Explizite Schreibtransaktion: Sperre sofort holen, ein Commit für alle Zeilen
+        if not cn.in_transaction:
+            cn.execute("BEGIN IMMEDIATE")
+        for i in range(0, len(rows), chunk):
+            cn.executemany(sql, rows[i:i + chunk])
         cn.commit()
 
-def _ensure_version_logged():
-    last = _get_meta("last_seen_version")
-    if last != APP_VERSION:
-        notes = DEFAULT_CHANGELOG_NOTES.get(APP_VERSION, [f"Update auf {APP_VERSION}"])
-        _insert_changelog(APP_VERSION, notes)
-        _set_meta("last_seen_version", APP_VERSION)
-
-def _count_rows(table: str) -> int:
-    with conn() as cn:
-        c = cn.cursor()
+def _insert_changelog(version: str, notes: List[str], cn: Optional[sqlite3.Connection] = None):
+    now = datetime.datetime.now().isoformat(timespec="seconds")
+    rows = [(now, version, note) for note in notes]
+    _bulk_insert("changelog", ("created_at", "version", "note"), rows, cn)
+
+def _ensure_version_logged(cn: Optional[sqlite3.Connection] = None):
+    with _use_conn(cn) as cn:
+        last = _get_meta("last_seen_version", cn)
+        if last != APP_VERSION:
+            notes = DEFAULT_CHANGELOG_NOTES.get(APP_VERSION, [f"Update auf {APP_VERSION}"])
+            # Meta + Changelog in einer Transaktion; _insert_changelog committet beides
+            if not cn.in_transaction:
+                cn.execute("BEGIN IMMEDIATE")
+            cn.execute(_META_UPSERT_SQL, ("last_seen_version", APP_VERSION))
+            _insert_changelog(APP_VERSION, notes, cn)
+
+@functools.lru_cache(maxsize=16)
+def _count_many_sql(tables: Tuple[str, ...]) -> str:
+    """Ein SELECT mit je einer COUNT(*)-Subquery pro Tabelle."""
+    return "SELECT " + ", ".join(f'(SELECT COUNT(*) FROM "{t}")' for t in tables)
+
+def _count_rows_many(tables: Tuple[str, ...], cn: Optional[sqlite3.Connection] = None) -> Dict[str, int]:
+    """Zeilenzahlen mehrerer Tabellen in einem Roundtrip (fehlende Tabellen = 0)."""
+    known = _known_tables()
+    present = tuple(t for t in tables if t in known)
+    out = {t: 0 for t in tables}
+    if not present:
+        return out
+    with _use_conn(cn) as cn:
+        # Trigger-gepflegte Zähler als Punktabfrage, nur der Rest per COUNT(*)
+        materialized: Dict[str, int] = {}
+        if "_counts" in known:
+            materialized = dict(cn.execute(
+                f"SELECT table_name, cnt FROM _counts WHERE table_name IN ({', '.join('?' * len(present))})",
+                present,
+            ).fetchall())
+        out.update(materialized)
+        rest = tuple(t for t in present if t not in materialized)
+        if rest:
+            out.update(zip(rest, cn.execute(_count_many_sql(rest)).fetchone()))
+    return out
+
+def _db_stamp() -> Tuple[int, int]:
+    """Änderungsmarke der DB: mtime von Datei und -wal (unter WAL landen Commits zuerst im -wal)."""
+    stamp = []
+    for p in (DB_PATH, DB_PATH.with_name(DB_PATH.name + "-wal")):
         try:
-            return c.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
-        except Exception:
-            return 0
+            stamp.append(p.stat().st_mtime_ns)
+        except OSError:
+            stamp.append(0)
+    return stamp[0], stamp[1]
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _count_rows_cached(tables: Tuple[str, ...], stamp: Tuple[int, int]) -> Dict[str, int]:
+    """Wie _count_rows_many; stamp (siehe _db_stamp) invalidiert bei jedem Schreibzugriff."""
+    return _count_rows_many(tables)
+
+# Schema-Marke des letzten Checks (prozessweit, gilt für alle Sessions; siehe core.db.schema_stamp)
+_ADMIN_READY_STAMP: Optional[Tuple[int, int]] = None
+
+def _ensure_admin_ready(cn: Optional[sqlite3.Connection] = None):
+    """_ensure_tables/_ensure_version_logged nur, wenn sich DB-Datei oder Schema geändert haben.
+
+    Ein Restore (aus jeder Session/jedem Prozess) ändert die Marke -> erneuter Check."""
+    global _ADMIN_READY_STAMP
+    with _use_conn(cn) as cn:
+        if schema_stamp(cn) == _ADMIN_READY_STAMP:
+            return
+        _ensure_tables(cn)
+        _ensure_version_logged(cn)
+        _ADMIN_READY_STAMP = schema_stamp(cn)
 
 # ---------------- Backups ----------------
-def _list_backups() -> List[Path]:
+@dataclass(frozen=True)
+class BackupEntry:
+    name: str
+    path: Path
+    mtime: float
+    size: int
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _scan_backups(dir_mtime_ns: int) -> List[BackupEntry]:
+    """Ein scandir-Durchlauf; stat() je Datei genau einmal. Key = Verzeichnis-mtime."""
+    entries: List[BackupEntry] = []
+    with os.scandir(BACKUP_DIR) as it:
+        for e in it:
+            if e.name.startswith("BCK_") and e.name.endswith(".bak") and e.is_file():
+                info = e.stat()
+                entries.append(BackupEntry(e.name, Path(e.path), info.st_mtime, info.st_size))
+    entries.sort(key=lambda b: b.mtime, reverse=True)
+    return entries
+
+def _list_backups() -> List[BackupEntry]:
     BACKUP_DIR.mkdir(parents=True, exist_ok=True)
-    return sorted(BACKUP_DIR.glob("BCK_*.bak"), key=lambda p: p.stat().st_mtime, reverse=True)
+    return _scan_backups(BACKUP_DIR.stat().st_mtime_ns)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _backup_index(dir_mtime_ns: int) -> Dict[str, BackupEntry]:
+    """Name -> Backup für die Auswahlbox; gleicher Key wie _scan_backups."""
+    return {b.name: b for b in _scan_backups(dir_mtime_ns)}
 
-def _last_backup_time() -> Optional[datetime.datetime]:
+def _backups_by_name() -> Dict[str, BackupEntry]:
+    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+    return _backup_index(BACKUP_DIR.stat().st_mtime_ns)
+
+def _last_backup_mtime() -> Optional[float]:
+    # bereits nach mtime absteigend sortiert -> kein max()-Durchlauf nötig
     files = _list_backups()
-    return datetime.datetime.fromtimestamp(max(files, key=lambda f: f.stat().st_mtime).stat().st_mtime) if files else None
+    return files[0].mtime if files else None
+
+def _days_since_last_backup(last_mtime: Optional[float]) -> Optional[int]:
+    """Alter des letzten Backups in ganzen Tagen – reine Float-Arithmetik."""
+    return None if last_mtime is None else int((time.time() - last_mtime) // 86400)
+
+# Seiten pro Schritt für das Hintergrund-Backup; zwischen den Schritten kommen andere Verbindungen zum Zug
+_BACKUP_PAGES = 1024
 
 def _create_backup() -> Optional[Path]:
     BACKUP_DIR.mkdir(parents=True, exist_ok=True)
-    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    target = BACKUP_DIR / f"BCK_{ts}.bak"
-    shutil.copy(DB_PATH, target)
+    stamp = time.strftime("%Y%m%d_%H%M%S")
+    target = BACKUP_DIR / f"BCK_{stamp}.bak"
+    # Zwei Backups in derselben Sekunde: Zähler anhängen statt zu überschreiben.
+    # Der Executor hat nur einen Worker, die Prüfung läuft also nie parallel.
+    n = 1
+    while target.exists():
+        n += 1
+        target = BACKUP_DIR / f"BCK_{stamp}_{n}.bak"
+    # Erst als .part schreiben: halbfertige Dateien erscheinen nicht in der Auswahl
+    part = target.with_name(target.name + ".part")
+    # Eigene Quellverbindung: läuft im Hintergrund-Thread und hält den Admin-Lock nicht.
+    # Online-Backup-API: konsistenter Snapshot inkl. WAL-Inhalt, Leser werden nicht blockiert
+    src = sqlite3.connect(str(DB_PATH))
+    dst = sqlite3.connect(str(part))
+    try:
+        try:
+            src.backup(dst, pages=_BACKUP_PAGES)
+        finally:
+            dst.close()
+            src.close()
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+    os.replace(part, target)
     return target
 
+@st.cache_resource(show_spinner=False)
+def _backup_executor() -> ThreadPoolExecutor:
+    """Ein Worker pro Prozess: Backups laufen im Hintergrund und nacheinander."""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="admin-backup")
+
 def _restore_backup(file_path: Path):
     BACKUP_DIR.mkdir(parents=True, exist_ok=True)
-    shutil.copy(DB_PATH, BACKUP_DIR / f"pre_restore_{int(time.time())}.bak")
-    shutil.copy(file_path, DB_PATH)
-
+    src = sqlite3.connect(str(file_path))
+    safety = sqlite3.connect(str(BACKUP_DIR / f"pre_restore_{int(time.time())}.bak"))
+    try:
+        # Direkt in die laufende Verbindung zurückspielen: kein Dateitausch unter offenen Handles
+        with _admin_conn() as cn:
+            # beides in einem Schritt: keine halb eingespielte DB sichtbar, Lock nur so kurz wie nötig
+            cn.backup(safety, pages=-1)
+            src.backup(cn, pages=-1)
+    finally:
+        src.close()
+        safety.close()
+    # Schema-Checks laufen danach von selbst erneut (Restore erhöht schema_version)
+    _known_tables.cache_clear()
+
+@functools.lru_cache(maxsize=256)
 def _format_size(bytes_: int) -> str:
     return f"{bytes_ / (1024 * 1024):.1f} MB"
 
@@ -202,22 +424,6 @@ def _db_size_mb() -> float:
     except Exception:
         return 0.0
 
-def _db_table_stats() -> Tuple[int, int]:
-    """Anzahl Tabellen und Gesamtzeilen (ohne sqlite_ interne)."""
-    with conn() as cn:
-        c = cn.cursor()
-        tables = c.execute(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'"
-        ).fetchall()
-        table_names = [t[0] for t in tables]
-        total_rows = 0
-        for t in table_names:
-            try:
-                total_rows += c.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
-            except Exception:
-                pass
-        return len(table_names), total_rows
-
 # ---------------- UI Helpers ----------------
 def _status_badge_from_days(days: Optional[int]) -> tuple[str, str, str]:
     if days is None:
@@ -250,10 +456,20 @@ def _card_html(title: str, color: str, lines: List[str]) -> str:
     </div>
     """
 
-def _pill(text: str, color: str = "#10b981") -> str:
-    return f"<span style='background:{color}22; color:{color}; padding:2px 6px; border:1px solid {color}55; border-radius:999px; font-size:11px;'>{text}</span>"
+@st.cache_data(ttl=300, show_spinner=False)
+def _load_changelog(max_id: int) -> List[Tuple[str, str, str]]:
+    """Letzte 20 Changelog-Einträge als (version, created_at, note); max_id dient nur als Cache-Key."""
+    with _admin_conn() as cn:
+        return cn.execute(
+            "SELECT version, created_at, note FROM changelog "
+            "ORDER BY id DESC LIMIT 20"
+        ).fetchall()
 
 # ---------------- Pending-Registrierungen (Unterpunkt) ----------------
+_FUNCTION_PRESETS = ("Admin", "Betriebsleiter", "Barleiter", "Kassa", "Garderobe")
+_NO_PRESET = "(keine Vorlage)"
+_PRESET_OPTIONS = (_NO_PRESET,) + _FUNCTION_PRESETS
+
 def _render_pending_registrations():
     section_title("👤 Ausstehende Registrierungen")
     pending = auth.list_pending_users()
@@ -261,14 +477,6 @@ def _render_pending_registrations():
         st.caption("Keine offenen Registrierungen.")
         return
 
-    function_presets = [
-        "Admin",
-        "Betriebsleiter",
-        "Barleiter",
-        "Kassa",
-        "Garderobe",
-    ]
-
     for u in pending:
         with st.container(border=True):
             st.markdown(
@@ -281,10 +489,10 @@ def _render_pending_registrations():
             with col1:
                 preset = st.selectbox(
                     "Rolle/Funktionen (Vorlage)",
-                    options=["(keine Vorlage)"] + function_presets,
+                    options=_PRESET_OPTIONS,
                     key=f"preset_{u['username']}",
                 )
-                default_text = "" if preset == "(keine Vorlage)" else preset
+                default_text = "" if preset == _NO_PRESET else preset
                 functions = st.text_input(
                     "Funktionen (frei editierbar, komma-getrennt)",
                     key=f"fn_{u['username']}",
@@ -303,21 +511,54 @@ def _render_pending_registrations():
                     st.rerun()
 
 # ---------------- Übersicht ----------------
-def _render_home():
-    users_cnt = _count_rows("users")
-    fix_cnt   = _count_rows("fixcosts")
+@st.cache_data(ttl=60, show_spinner=False)
+def _business_kpis(stamp: Tuple[int, int]) -> Tuple[str, float, float]:
+    """(letzte Inventur, Einkauf gesamt, Umsatz gesamt); stamp dient nur als Cache-Key.
+
+    Die Artikelanzahl kommt aus den Zeilenzahlen (_count_rows_cached)."""
+    tables = _known_tables()
+    parts = [
+        "(SELECT MAX(created_at) FROM inventur)" if "inventur" in tables else "NULL",
+        "(SELECT SUM(purchase_price) FROM items)" if "items" in tables else "0",
+        "(SELECT SUM(amount) FROM umsatz)" if "umsatz" in tables else "0",
+    ]
+    with _admin_conn() as cn:
+        last_inv, einkauf_total, umsatz_total = cn.execute(
+            "SELECT " + ", ".join(parts)
+        ).fetchone()
+
+    last_inv_str = "—"
+    if last_inv:
+        try:
+            last_inv_str = datetime.datetime.fromisoformat(last_inv).strftime("%d.%m.%Y")
+        except Exception:
+            try:
+                last_inv_str = datetime.datetime.strptime(last_inv, "%Y-%m-%d %H:%M:%S").strftime("%d.%m.%Y")
+            except Exception:
+                last_inv_str = str(last_inv)
+    return last_inv_str, einkauf_total or 0, umsatz_total or 0
+
+def _render_home(pending_count: int = 0):
+    # Kennzahlen sind bis zu 60 s gecacht; auf Wunsch sofort neu laden
+    if st.button("🔄 Aktualisieren", key="admin_home_refresh"):
+        _count_rows_cached.clear()
+        _business_kpis.clear()
+
+    # Alle Zeilenzahlen in einem (gecachten) Roundtrip
+    all_tables = _user_tables()
+    counts = _count_rows_cached(all_tables, _db_stamp())
+    users_cnt = counts.get("users", 0)
+    fix_cnt   = counts.get("fixcosts", 0)
     backups   = _list_backups()
     total_backups = len(backups)
 
-    last_bkp_dt = _last_backup_time()
-    days_since = None if last_bkp_dt is None else (datetime.date.today() - last_bkp_dt.date()).days
+    # _list_backups ist nach mtime absteigend sortiert -> erstes Element = neuestes
+    last_bkp_mtime = backups[0].mtime if backups else None
+    days_since = _days_since_last_backup(last_bkp_mtime)
     bkp_color, bkp_label, bkp_tip = _status_badge_from_days(days_since)
 
     db_size = _db_size_mb()
-    num_tables, total_rows = _db_table_stats()
-
-    # Pending Registrierungen (Badge für Übersicht)
-    pending_count = len(auth.list_pending_users())
+    num_tables, total_rows = len(all_tables), sum(counts.values())
 
     # 4 Karten
     c1, c2, c3, c4 = st.columns(4, gap="large")
@@ -334,7 +575,7 @@ def _render_home():
         st.markdown(_card_html("Systemstatus", "#22c55e", lines), unsafe_allow_html=True)
 
     with c2:
-        last_text = "—" if not last_bkp_dt else last_bkp_dt.strftime("%d.%m.%Y %H:%M")
+        last_text = "—" if last_bkp_mtime is None else time.strftime("%d.%m.%Y %H:%M", time.localtime(last_bkp_mtime))
         st.markdown(
             _card_html(
                 "Backupstatus",
@@ -365,31 +606,8 @@ def _render_home():
 
     with c4:
         # Betriebskennzahlen (sanft, da optional)
-        last_inv_str = "—"
-        artikel_count = 0
-        einkauf_total = 0
-        umsatz_total = 0
-        with conn() as cn:
-            c = cn.cursor()
-            if _table_exists(c, "inventur"):
-                row = c.execute("SELECT MAX(created_at) FROM inventur").fetchone()
-                last_inv = row[0] if row and row[0] else None
-                if last_inv:
-                    try:
-                        last_inv_str = datetime.datetime.fromisoformat(last_inv).strftime("%d.%m.%Y")
-                    except Exception:
-                        try:
-                            last_inv_str = datetime.datetime.strptime(last_inv, "%Y-%m-%d %H:%M:%S").strftime("%d.%m.%Y")
-                        except Exception:
-                            last_inv_str = str(last_inv)
-            if _table_exists(c, "items"):
-                row = c.execute("SELECT COUNT(*) FROM items").fetchone()
-                artikel_count = row[0] if row and row[0] else 0
-                row = c.execute("SELECT SUM(purchase_price) FROM items").fetchone()
-                einkauf_total = row[0] if row and row[0] else 0
-            if _table_exists(c, "umsatz"):
-                row = c.execute("SELECT SUM(amount) FROM umsatz").fetchone()
-                umsatz_total = row[0] if row and row[0] else 0
+        last_inv_str, einkauf_total, umsatz_total = _business_kpis(_db_stamp())
+        artikel_count = counts.get("items", 0)
 
         wareneinsatz = (einkauf_total / umsatz_total * 100) if umsatz_total > 0 else None
         lines = [
@@ -407,20 +625,18 @@ def _render_home():
 
     # --- Changelog ---
     section_title("📝 Änderungsprotokoll")
-    with conn() as cn:
-        df = pd.read_sql(
-            "SELECT created_at, version, note FROM changelog "
-            "ORDER BY datetime(created_at) DESC LIMIT 20",
-            cn,
-        )
-    if df.empty:
+    # MAX(id) ist ein Rowid-Lookup und ändert sich genau dann, wenn Einträge dazukommen
+    with _admin_conn() as cn:
+        max_id = cn.execute("SELECT MAX(id) FROM changelog").fetchone()[0] or 0
+    entries = _load_changelog(max_id)
+    if not entries:
         st.info("Keine Einträge im Changelog.")
     else:
-        for _, r in df.iterrows():
-            st.markdown(
-                f"<div style='font-size:12px;opacity:0.8;'><b>{r['version']}</b> – {r['created_at'][:16]}: {r['note']}</div>",
-                unsafe_allow_html=True,
-            )
+        html = "".join(
+            f"<div style='font-size:12px;opacity:0.8;'><b>{version}</b> – {(created_at or '')[:16]}: {note}</div>"
+            for version, created_at, note in entries
+        )
+        st.markdown(html, unsafe_allow_html=True)
 
 # ---------------- Betrieb (Grundparameter) ----------------
 def _render_business_admin():
@@ -551,12 +767,16 @@ def _render_business_admin():
             st.success("Betriebs- & Einheiten-Daten gespeichert. Öffne danach 'Abrechnung' erneut.")
 
 # ---------------- Fixkosten ----------------
+@st.cache_data(ttl=10, show_spinner=False)
+def _load_fixcosts(stamp: Tuple[int, int]) -> List[Tuple]:
+    """Fixkosten-Liste; stamp (siehe _db_stamp) dient nur als Cache-Key."""
+    with _admin_conn() as cn:
+        return cn.execute("SELECT id, name, amount, note, is_active FROM fixcosts ORDER BY id").fetchall()
+
 def _render_fixcost_admin():
     section_title("💰 Fixkostenverwaltung")
 
-    with conn() as cn:
-        c = cn.cursor()
-        costs = c.execute("SELECT id, name, amount, note, is_active FROM fixcosts ORDER BY id").fetchall()
+    costs = _load_fixcosts(_db_stamp())
 
     with st.form("add_fixcost"):
         c1, c2 = st.columns([2, 1])
@@ -568,156 +788,218 @@ def _render_fixcost_admin():
             if not name:
                 st.warning("Bezeichnung ist erforderlich.")
             else:
-                with conn() as cn:
-                    c = cn.cursor()
-                    c.execute(
+                with _admin_conn() as cn:
+                    cn.execute(
                         "INSERT INTO fixcosts(name, amount, note, is_active) VALUES(?,?,?,?)",
                         (name, float(amount), note, int(active)),
                     )
-                    cn.commit()
                 st.success("Fixkosten hinzugefügt.")
                 st.rerun()
 
     st.divider()
     if not costs:
         st.info("Noch keine Fixkosten erfasst.")
-    else:
-        for fid, name, amount, note, active in costs:
-            state_emoji = "🟢" if active else "⚪"
-            with st.expander(f"{state_emoji} {name} – {amount:.2f} €", expanded=False):
-                st.markdown(_pill("aktiv", "#10b981") if active else _pill("inaktiv", "#6b7280"), unsafe_allow_html=True)
-                st.write("")
-                c1, c2 = st.columns([2, 1])
-                e_name = c1.text_input("Bezeichnung", value=name, key=f"fc_name_{fid}")
-                e_amount = c2.number_input("Betrag (€)", value=float(amount or 0.0), step=10.0, key=f"fc_amount_{fid}")
-                e_note = st.text_input("Notiz", value=note or "", key=f"fc_note_{fid}")
-                e_active = st.checkbox("Aktiv", value=bool(active), key=f"fc_active_{fid}")
-                s1, s2 = st.columns(2)
-                if s1.button("💾 Speichern", key=f"fc_save_{fid}"):
-                    with conn() as cn:
-                        c = cn.cursor()
-                        c.execute(
-                            "UPDATE fixcosts SET name=?, amount=?, note=?, is_active=? WHERE id=?",
-                            (e_name, float(e_amount), e_note, int(e_active), fid),
-                        )
-                        cn.commit()
-                    st.success("Gespeichert.")
-                if s2.button("🗑️ Löschen", key=f"fc_del_{fid}"):
-                    with conn() as cn:
-                        c = cn.cursor()
-                        c.execute("DELETE FROM fixcosts WHERE id=?", (fid,))
-                        cn.commit()
-                    st.warning(f"Fixkosten '{name}' gelöscht.")
-                    st.rerun()
+        return
+
+    import pandas as pd  # lazy: nur für den Editor
+
+    orig = {
+        fid: (name or "", float(amount or 0.0), note or "", bool(active))
+        for fid, name, amount, note, active in costs
+    }
+    df = pd.DataFrame(
+        [(fid,) + vals + (False,) for fid, vals in orig.items()],
+        columns=["id", "name", "amount", "note", "is_active", "delete"],
+    ).set_index("id")
+
+    edited = st.data_editor(
+        df,
+        use_container_width=True,
+        hide_index=True,  # ID bleibt unsichtbar als Index vorhanden
+        num_rows="fixed",
+        key="fc_editor",
+        height=min(500, 120 + 35 * len(df)),
+        column_config={
+            "name": st.column_config.TextColumn("Bezeichnung", required=True),
+            "amount": st.column_config.NumberColumn("Betrag (€)", min_value=0.0, step=10.0, format="%.2f"),
+            "note": st.column_config.TextColumn("Notiz"),
+            "is_active": st.column_config.CheckboxColumn("Aktiv"),
+            "delete": st.column_config.CheckboxColumn("Löschen", help="Zum Löschen markieren"),
+        },
+    )
+
+    if st.button("💾 Änderungen speichern", key="fc_save", use_container_width=True):
+        updates: List[Tuple] = []
+        deletes: List[Tuple[int]] = []
+        for fid, name, amount, note, active, delete in edited.itertuples(name=None):
+            fid = int(fid)
+            if bool(delete):
+                deletes.append((fid,))
+                continue
+            new_row = (
+                (name or "").strip() or orig[fid][0],
+                float(amount) if pd.notna(amount) else 0.0,
+                note if isinstance(note, str) else "",
+                bool(active),
+            )
+            if new_row != orig[fid]:
+                updates.append(new_row[:3] + (int(new_row[3]), fid))
+
+        if not updates and not deletes:
+            st.info("Keine Änderungen.")
+        else:
+            # Eine Schreibtransaktion für alle Zeilen; Commit beim Verlassen von _admin_conn
+            with _admin_conn() as cn:
+                if not cn.in_transaction:
+                    cn.execute("BEGIN IMMEDIATE")
+                if updates:
+                    cn.executemany(
+                        "UPDATE fixcosts SET name=?, amount=?, note=?, is_active=? WHERE id=?",
+                        updates,
+                    )
+                if deletes:
+                    cn.executemany("DELETE FROM fixcosts WHERE id=?", deletes)
+            st.toast(f"{len(updates)} geändert, {len(deletes)} gelöscht.")
+            st.rerun()
 
 # ---------------- Datenbank-Übersicht ----------------
+PREVIEW_LIMIT = 1000
+
+def _table_to_csv_bytes(name: str, cn: Optional[sqlite3.Connection] = None) -> bytes:
+    """CSV-Export direkt aus dem Cursor (ohne DataFrame-Zwischenschritt)."""
+    if name not in _known_tables():
+        raise ValueError(f"Unbekannte Tabelle: {name}")
+    buf = io.BytesIO()
+    text = io.TextIOWrapper(buf, encoding="utf-8-sig", newline="")
+    w = csv.writer(text, lineterminator="\n")
+    with _use_conn(cn) as cn:
+        cur = cn.execute(f'SELECT * FROM "{name}"')
+        w.writerow([d[0] for d in cur.description])
+        w.writerows(cur)
+    text.flush()
+    data = buf.getvalue()
+    text.detach()
+    return data
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _load_preview(table: str, stamp: Tuple[int, int]) -> Dict[str, list]:
+    """Vorschau (max. PREVIEW_LIMIT Zeilen) als {Spalte: Werte}; stamp (siehe _db_stamp) dient nur als Cache-Key."""
+    if table not in _known_tables():
+        raise ValueError(f"Unbekannte Tabelle: {table}")
+    with _admin_conn() as cn:
+        cur = cn.execute(f'SELECT * FROM "{table}" LIMIT {PREVIEW_LIMIT}')
+        cols = [d[0] for d in cur.description]
+        rows = cur.fetchall()
+    # spaltenweise ohne DataFrame-Aufbau; st.dataframe nimmt das Dict direkt
+    return {c: [r[i] for r in rows] for i, c in enumerate(cols)}
+
 def _render_db_overview():
     section_title("🗂️ Datenbank – Übersicht & Export")
-    with conn() as cn:
-        c = cn.cursor()
-        c.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [r[0] for r in c.fetchall()]
+    tables = list(_user_tables())
     if not tables:
         st.info("Keine Tabellen vorhanden.")
         return
     selected_table = st.selectbox("Tabelle auswählen", tables)
-    if selected_table:
-        with conn() as cn:
-            df = pd.read_sql(f"SELECT * FROM {selected_table}", cn)
-        st.dataframe(df, use_container_width=True, height=420)
-        csv = df.to_csv(index=False).encode("utf-8-sig")
-        st.download_button("📤 CSV exportieren", csv, file_name=f"{selected_table}.csv", mime="text/csv")
+    if selected_table and selected_table in tables:
+        stamp = _db_stamp()
+        preview = _load_preview(selected_table, stamp)
+        st.dataframe(preview, use_container_width=True, height=420)
+        n_rows = len(next(iter(preview.values()), []))
+        if n_rows >= PREVIEW_LIMIT:
+            st.caption(f"Vorschau auf {PREVIEW_LIMIT} Zeilen begrenzt – der CSV-Export enthält alle Zeilen.")
+        # Vollexport nur auf Anforderung bauen (nicht bei jedem Rerun); ein Export pro Session.
+        # Gilt nur für (Tabelle, DB-Stand): bei Tabellenwechsel oder Datenänderung verwerfen
+        export_key = (selected_table, stamp)
+        export = st.session_state.get("_admin_csv")
+        if export and export[0] != export_key:
+            st.session_state.pop("_admin_csv", None)
+            export = None
+        if st.button("📦 Vollständigen CSV-Export erstellen", key="db_csv_build"):
+            export = (export_key, _table_to_csv_bytes(selected_table))
+            st.session_state["_admin_csv"] = export
+        if export:
+            st.download_button(
+                "📤 CSV exportieren",
+                export[1],
+                file_name=f"{selected_table}.csv",
+                mime="text/csv",
+            )
 
 # ---------------- Backup-Verwaltung ----------------
+@st.fragment(run_every=1.0)
+def _backup_poll():
+    """Nur aktiv, solange ein Backup läuft; danach ein Rerun, der das Ergebnis abholt."""
+    fut: Optional[Future] = st.session_state.get("bkp_future")
+    if fut is None or fut.done():
+        st.rerun()
+    st.caption("⏳ Backup läuft im Hintergrund …")
+
+# Fragment: Auswahl/Checkbox rerunnen nur diesen Abschnitt, nicht das ganze Cockpit
+@st.fragment
 def _render_backup_admin():
     section_title("💾 Datenbank-Backups")
 
-    lb = _last_backup_time()
-    last_text = lb.strftime("%d.%m.%Y %H:%M") if lb else "—"
+    lb = _last_backup_mtime()
+    last_text = time.strftime("%d.%m.%Y %H:%M", time.localtime(lb)) if lb is not None else "—"
     st.caption(f"Letztes Backup: **{last_text}**")
 
     col_a, col_b = st.columns([1, 1])
 
-    if col_a.button("🧷 Backup jetzt erstellen", key="bkp_create_admin", use_container_width=True):
-        created = _create_backup()
-        if created:
-            st.success(f"Backup erstellt: {created.name}")
-        time.sleep(1)
-        st.rerun()
+    # Laufendes Hintergrund-Backup: Status zeigen bzw. Ergebnis abholen
+    fut: Optional[Future] = st.session_state.get("bkp_future")
+    running = fut is not None and not fut.done()
+    if running:
+        _backup_poll()
+    elif fut is not None:
+        st.session_state.pop("bkp_future", None)
+        try:
+            created = fut.result()
+            if created:
+                st.toast(f"Backup erstellt: {created.name}")
+        except Exception as e:
+            st.error(f"Backup fehlgeschlagen: {e}")
+
+    if col_a.button("🧷 Backup jetzt erstellen", key="bkp_create_admin", disabled=running, use_container_width=True):
+        st.session_state["bkp_future"] = _backup_executor().submit(_create_backup)
+        st.rerun(scope="fragment")
 
-    backups = _list_backups()
-    if not backups:
+    opt = _backups_by_name()
+    if not opt:
         st.info("Keine Backups gefunden.")
         return
 
-    opt = {f.name: f for f in backups}
-    sel = st.selectbox("Backup auswählen", list(opt.keys()))
+    sel = st.selectbox("Backup auswählen", list(opt))
     chosen = opt[sel]
-    st.write(f"📅 {time.ctime(chosen.stat().st_mtime)}")
-    st.write(f"📁 {chosen}")
-    st.write(f"💾 Größe: {_format_size(chosen.stat().st_size)}")
+    # Angaben stammen aus dem gecachten scandir-Durchlauf, kein stat() pro Rerun
+    st.write(f"📅 {time.ctime(chosen.mtime)}")
+    st.write(f"📁 {chosen.path}")
+    st.write(f"💾 Größe: {_format_size(chosen.size)}")
 
     ok = st.checkbox("Ich bestätige die Wiederherstellung dieses Backups.", key="bkp_restore_confirm")
-    if col_b.button("🔄 Backup wiederherstellen", key="bkp_restore_action", disabled=not ok, use_container_width=True):
+    if col_b.button("🔄 Backup wiederherstellen", key="bkp_restore_action", disabled=not ok or running, use_container_width=True):
         with st.spinner("Backup wird wiederhergestellt..."):
-            _restore_backup(chosen)
-            time.sleep(1.0)
+            _restore_backup(chosen.path)
         st.success("✅ Backup wiederhergestellt. Bitte App neu starten.")
 
 # ---------------- Haupt-Render ----------------
-def _inv_status_pill(status: str, year: int, month: int) -> str:
-    today = datetime.date.today()
-    s = (status or "editing").lower()
-    overdue = (year < today.year) or (year == today.year and month < today.month)
-
-    if s == "approved":
-        color = "#bbf7d0"
-        bg = "rgba(22,163,74,0.18)"
-        border = "rgba(22,163,74,0.55)"
-        label = "Freigegeben"
-    elif s == "submitted":
-        color = "#fed7aa"
-        bg = "rgba(245,158,11,0.15)"
-        border = "rgba(245,158,11,0.55)"
-        label = "Zur Freigabe eingereicht"
-    elif overdue:
-        color = "#fecaca"
-        bg = "rgba(239,68,68,0.15)"
-        border = "rgba(239,68,68,0.6)"
-        label = "Überfällig"
-    else:
-        color = "#bfdbfe"
-        bg = "rgba(59,130,246,0.15)"
-        border = "rgba(59,130,246,0.55)"
-        label = "In Bearbeitung"
-
-    return f"""
-    <span style="
-        display:inline-block;
-        padding:2px 8px;
-        border-radius:999px;
-        font-size:0.75rem;
-        font-weight:500;
-        background:{bg};
-        color:{color};
-        border:1px solid {border};
-    ">{label}</span>
-    """
-# ---------------- Haupt-Render ----------------
 def render_admin():
     """Entry-Point für das Admin-Cockpit (wird von app.py aufgerufen)."""
     if st.session_state.get("role") != "admin":
         st.error("Kein Zugriff. Adminrechte erforderlich.")
         return
 
-    _ensure_tables()
-    _ensure_version_logged()
+    # Tabellen-Snapshot pro Rerun neu aufbauen (andere Module legen Tabellen an)
+    _known_tables.cache_clear()
+
+    # Gemeinsame Verbindung nur je DB-Aufruf sperren, nie über das Rendern der Widgets
+    with _admin_conn() as cn:
+        _ensure_admin_ready(cn)
 
     # Kopf
     page_header("Admin-Cockpit", "System- und Datenübersicht")
 
-    # Zähler für Pending-Registrierungen (Badge in Sub-Tab)
-    pending_count = len(auth.list_pending_users())
+    # Zähler für Pending-Registrierungen (Sub-Tab-Badge + Übersicht), ein COUNT statt zweimal alle Zeilen
+    pending_count = auth.pending_count()
     pending_label = "📝 Registrierungen" if pending_count == 0 else f"📝 Registrierungen ({pending_count})"
 
     # Haupt-Tabs
@@ -732,13 +1014,15 @@ def render_admin():
     ])
 
     with tabs[0]:
-        _render_home()
+        _render_home(pending_count)
     with tabs[1]:
         _render_business_admin()
     with tabs[2]:
         # Sub-Tabs unter "Benutzer"
         sub = st.tabs(["👥 Benutzerverwaltung", pending_label])
         with sub[0]:
+            # Benutzer-UI (modules/admin/users_admin.py) erst hier laden
+            from .users_admin import render_users_admin
             render_users_admin()
         with sub[1]:
             _render_pending_registrations()
@@ -746,6 +1030,7 @@ def render_admin():
         _render_fixcost_admin()
     with tabs[4]:
         _render_db_overview()
+
     with tabs[5]:
         try:
             from modules.import_items import render_data_tools
@@ -1,7 +1,7 @@
+import functools
 import streamlit as st
-import pandas as pd
 from typing import List, Tuple, Dict, Optional
-from core.db import conn
+from core.db import conn, schema_stamp
 from core.ui_theme import section_title
 
 try:
@@ -48,10 +48,10 @@ def _ensure_user_schema():
             c.execute("ALTER TABLE users ADD COLUMN passhash TEXT NOT NULL DEFAULT ''")
         if "created_at" not in cols:
             c.execute("ALTER TABLE users ADD COLUMN created_at TEXT")
-        # Backfill
-        c.execute("UPDATE users SET passhash = COALESCE(passhash, '')")
-        c.execute("UPDATE users SET created_at = COALESCE(created_at, datetime('now'))")
-        c.execute("UPDATE users SET units = COALESCE(units, '')")
+        # Backfill (nur NULL-Lücken, sonst wird jede Zeile neu geschrieben)
+        c.execute("UPDATE users SET passhash = '' WHERE passhash IS NULL")
+        c.execute("UPDATE users SET created_at = datetime('now') WHERE created_at IS NULL")
+        c.execute("UPDATE users SET units = '' WHERE units IS NULL")
         cn.commit()
 
 def _ensure_function_schema():
@@ -72,9 +72,24 @@ def _ensure_function_schema():
                 c.execute(f"ALTER TABLE functions ADD COLUMN {col_name} {col_def}")
         # Nullwerte auffüllen
         set_expr = ", ".join([f"{col}=COALESCE({col},0)" for col, _ in PERM_COLS])
-        c.execute(f"UPDATE functions SET {set_expr}")
+        where_expr = " OR ".join([f"{col} IS NULL" for col, _ in PERM_COLS])
+        c.execute(f"UPDATE functions SET {set_expr} WHERE {where_expr}")
         cn.commit()
 
+# Schema-Marke des letzten Checks (prozessweit; ein Restore ändert sie -> alle Sessions prüfen erneut)
+_SCHEMA_READY_STAMP: Optional[Tuple[int, int]] = None
+
+def _ensure_schema_once():
+    global _SCHEMA_READY_STAMP
+    with conn() as cn:
+        if schema_stamp(cn) == _SCHEMA_READY_STAMP:
+            return
+    _ensure_user_schema()
+    _ensure_function_schema()
+    with conn() as cn:
+        _SCHEMA_READY_STAMP = schema_stamp(cn)
+
+
 # ---------------- Meta (Counts für Units) ----------------
 
 _META_UNIT_KEYS = {
@@ -83,19 +98,28 @@ _META_UNIT_KEYS = {
     "cloakrooms": ["cloakrooms_count", "business_cloakrooms", "num_cloakrooms", "garderoben_count"],
 }
 
-def _get_meta_value(key: str) -> Optional[str]:
+# Alle Kandidaten-Keys (in Prioritätsreihenfolge je Unit-Typ)
+_META_UNIT_ALL_KEYS: Tuple[str, ...] = tuple(k for keys in _META_UNIT_KEYS.values() for k in keys)
+
+def _get_meta_values(keys: Tuple[str, ...]) -> Dict[str, Optional[str]]:
+    """Mehrere meta-Keys mit einer Verbindung und einer IN-Abfrage lesen."""
+    out: Dict[str, Optional[str]] = {k: None for k in keys}
     with conn() as cn:
-        c = cn.cursor()
         try:
-            row = c.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+            out.update(cn.execute(
+                f"SELECT key, value FROM meta WHERE key IN ({', '.join('?' * len(keys))})",
+                keys,
+            ).fetchall())
         except Exception:
-            return None
-        return row[0] if row else None
+            pass
+    return out
 
 def _get_unit_counts() -> Dict[str, int]:
+    values = _get_meta_values(_META_UNIT_ALL_KEYS)
+
     def _first_int(keys: List[str], default: int = 0) -> int:
         for k in keys:
-            v = _get_meta_value(k)
+            v = values.get(k)
             if v is not None:
                 try:
                     return max(0, int(str(v).strip()))
@@ -139,6 +163,14 @@ def _decode_units(units: str) -> Dict[str, List[int]]:
         out[k] = sorted(out[k])
     return out
 
+@functools.lru_cache(maxsize=32)
+def _unit_labels(prefix: str, amount: int) -> Tuple[str, ...]:
+    """Auswahl-Labels 'Bar 1' … 'Bar n' (einmal gebaut, nicht pro Render)."""
+    return tuple(f"{prefix} {i}" for i in range(1, amount + 1))
+
+def _unit_number(label: str) -> int:
+    return int(label.rsplit(" ", 1)[1])
+
 # ------------------------------------------------------------
 # DATEN-HELPERS
 # ------------------------------------------------------------
@@ -148,14 +180,18 @@ def _get_functions_list():
         c = cn.cursor()
         return [r[0] for r in c.execute("SELECT name FROM functions ORDER BY name").fetchall()]
 
-def _count_users_with_function(func_name: str) -> int:
+def _count_users_per_function() -> List[Tuple[str, int]]:
+    """(Funktion, Anzahl Benutzer) für alle Funktionen in einer Abfrage."""
     with conn() as cn:
         c = cn.cursor()
         sql = """
-            SELECT COUNT(*) FROM users
-            WHERE (','||LOWER(COALESCE(functions,''))||',') LIKE '%,'||LOWER(?)||',%'
+            SELECT f.name,
+                   (SELECT COUNT(*) FROM users u
+                     WHERE (','||LOWER(COALESCE(u.functions,''))||',') LIKE '%,'||LOWER(f.name)||',%')
+              FROM functions f
+             ORDER BY f.name
         """
-        return c.execute(sql, (func_name,)).fetchone()[0]
+        return c.execute(sql).fetchall()
 
 # ------------------------------------------------------------
 # UI-HELPERS
@@ -186,11 +222,18 @@ def _card_html(title: str, color: str, lines: List[str]) -> str:
 # TAB 1 – ÜBERSICHT
 # ------------------------------------------------------------
 
+_FUNCTION_COLORS = {
+    "admin": "#ef4444",
+    "barlead": "#0ea5e9",
+    "inventur": "#f59e0b",
+    "user": "#10b981",
+}
+
 def _tab_overview():
     with conn() as cn:
         c = cn.cursor()
-        funcs = c.execute("SELECT name FROM functions ORDER BY name").fetchall()
         total_users = c.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    funcs = _count_users_per_function()
 
     c1, c2, c3, c4 = st.columns(4, gap="large")
 
@@ -201,14 +244,8 @@ def _tab_overview():
     )
 
     # Funktions-Karten
-    for i, (fname,) in enumerate(funcs):
-        count = _count_users_with_function(fname)
-        color = {
-            "admin": "#ef4444",
-            "barlead": "#0ea5e9",
-            "inventur": "#f59e0b",
-            "user": "#10b981",
-        }.get(fname.lower(), "#6b7280")
+    for i, (fname, count) in enumerate(funcs):
+        color = _FUNCTION_COLORS.get(fname.lower(), "#6b7280")
 
         # Spalte bleibt wie bisher
         col = [c2, c3, c4, c1][i % 4]
@@ -237,34 +274,31 @@ def _unit_multiselects(default_units: Dict[str, List[int]] | None = None):
     row1 = st.columns(3)
 
     # Bars
-    bar_opts = [f"Bar {i}" for i in range(1, counts["bars"] + 1)]
-    bar_map = {f"Bar {i}": i for i in range(1, counts["bars"] + 1)}
+    bar_opts = _unit_labels("Bar", counts["bars"])
     sel_bars_lbl = row1[0].multiselect(
         "Bars", bar_opts,
-        default=[f"Bar {i}" for i in default_units.get("bar", []) if i in bar_map.values()],
+        default=[bar_opts[i - 1] for i in default_units.get("bar", []) if 1 <= i <= counts["bars"]],
         key=st.session_state.get("_ua_key_bar", f"ua_units_bars_new")
     )
-    sel_bars = [bar_map[lbl] for lbl in sel_bars_lbl]
+    sel_bars = [_unit_number(lbl) for lbl in sel_bars_lbl]
 
     # Kassen
-    reg_opts = [f"Kassa {i}" for i in range(1, counts["registers"] + 1)]
-    reg_map = {f"Kassa {i}": i for i in range(1, counts["registers"] + 1)}
+    reg_opts = _unit_labels("Kassa", counts["registers"])
     sel_regs_lbl = row1[1].multiselect(
         "Kassen", reg_opts,
-        default=[f"Kassa {i}" for i in default_units.get("cash", []) if i in reg_map.values()],
+        default=[reg_opts[i - 1] for i in default_units.get("cash", []) if 1 <= i <= counts["registers"]],
         key=st.session_state.get("_ua_key_reg", f"ua_units_regs_new")
     )
-    sel_regs = [reg_map[lbl] for lbl in sel_regs_lbl]
+    sel_regs = [_unit_number(lbl) for lbl in sel_regs_lbl]
 
     # Garderoben
-    cloak_opts = [f"Garderobe {i}" for i in range(1, counts["cloakrooms"] + 1)]
-    cloak_map = {f"Garderobe {i}": i for i in range(1, counts["cloakrooms"] + 1)}
+    cloak_opts = _unit_labels("Garderobe", counts["cloakrooms"])
     sel_cloak_lbl = row1[2].multiselect(
         "Garderoben", cloak_opts,
-        default=[f"Garderobe {i}" for i in default_units.get("cloak", []) if i in cloak_map.values()],
+        default=[cloak_opts[i - 1] for i in default_units.get("cloak", []) if 1 <= i <= counts["cloakrooms"]],
         key=st.session_state.get("_ua_key_cloak", f"ua_units_cloak_new")
     )
-    sel_cloaks = [cloak_map[lbl] for lbl in sel_cloak_lbl]
+    sel_cloaks = [_unit_number(lbl) for lbl in sel_cloak_lbl]
 
     return sel_bars, sel_regs, sel_cloaks
 
@@ -384,34 +418,24 @@ def _edit_user_card(row, func_list):
         st.session_state[f"_ua_key_reg_{uid}"] = f"ua_units_regs_{uid}"
         st.session_state[f"_ua_key_cloak_{uid}"] = f"ua_units_cloak_{uid}"
 
-        def _labels(prefix: str, amount: int) -> List[str]:
-            if prefix == "Bar":
-                return [f"Bar {i}" for i in range(1, amount + 1)]
-            if prefix == "Kassa":
-                return [f"Kassa {i}" for i in range(1, amount + 1)]
-            return [f"Garderobe {i}" for i in range(1, amount + 1)]
-
         rowu = st.columns(3)
         # Bars
-        bars_all = _labels("Bar", counts["bars"])
-        bars_map = {lbl: int(lbl.split()[-1]) for lbl in bars_all}
-        bars_default = [f"Bar {i}" for i in parsed.get("bar", []) if 1 <= i <= counts["bars"]]
+        bars_all = _unit_labels("Bar", counts["bars"])
+        bars_default = [bars_all[i - 1] for i in parsed.get("bar", []) if 1 <= i <= counts["bars"]]
         bars_sel_lbl = rowu[0].multiselect("Bars", bars_all, default=bars_default, key=f"ua_units_bars_{uid}")
-        bars_sel = [bars_map[l] for l in bars_sel_lbl]
+        bars_sel = [_unit_number(l) for l in bars_sel_lbl]
 
         # Kassen
-        regs_all = _labels("Kassa", counts["registers"])
-        regs_map = {lbl: int(lbl.split()[-1]) for lbl in regs_all}
-        regs_default = [f"Kassa {i}" for i in parsed.get("cash", []) if 1 <= i <= counts["registers"]]
+        regs_all = _unit_labels("Kassa", counts["registers"])
+        regs_default = [regs_all[i - 1] for i in parsed.get("cash", []) if 1 <= i <= counts["registers"]]
         regs_sel_lbl = rowu[1].multiselect("Kassen", regs_all, default=regs_default, key=f"ua_units_regs_{uid}")
-        regs_sel = [regs_map[l] for l in regs_sel_lbl]
+        regs_sel = [_unit_number(l) for l in regs_sel_lbl]
 
         # Garderoben
-        cloak_all = _labels("Garderobe", counts["cloakrooms"])
-        cloak_map = {lbl: int(lbl.split()[-1]) for lbl in cloak_all}
-        cloak_default = [f"Garderobe {i}" for i in parsed.get("cloak", []) if 1 <= i <= counts["cloakrooms"]]
+        cloak_all = _unit_labels("Garderobe", counts["cloakrooms"])
+        cloak_default = [cloak_all[i - 1] for i in parsed.get("cloak", []) if 1 <= i <= counts["cloakrooms"]]
         cloak_sel_lbl = rowu[2].multiselect("Garderoben", cloak_all, default=cloak_default, key=f"ua_units_cloak_{uid}")
-        cloak_sel = [cloak_map[l] for l in cloak_sel_lbl]
+        cloak_sel = [_unit_number(l) for l in cloak_sel_lbl]
 
         new_units = _encode_units(bars_sel, regs_sel, cloak_sel)
 
@@ -466,8 +490,11 @@ def _tab_functions():
             FROM functions ORDER BY name
         """).fetchall()
 
+    # Benutzer je Funktion in einer Abfrage statt einer pro Funktion
+    users_per_func = dict(_count_users_per_function())
+
     for fid, name, desc, v_s, e_s, v_i, e_i in funcs:
-        users_with = _count_users_with_function(name)
+        users_with = users_per_func.get(name, 0)
         with st.expander(f"{name} · {users_with} User", expanded=False):
             c1, c2 = st.columns([2, 1])
             # Admin-Funktion bleibt geschützt
@@ -544,8 +571,7 @@ def render_users_admin():
     im Admin-Cockpit nicht mehrere Tabzeilen untereinander entstehen.
     Alle bisherigen Funktionen bleiben erhalten.
     """
-    _ensure_user_schema()
-    _ensure_function_schema()
+    _ensure_schema_once()
 
     mode = st.radio(
         "",
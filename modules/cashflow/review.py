@@ -37,8 +37,8 @@ def _export_pdf(df: pd.DataFrame, ev_label: str) -> bytes:
         c.drawString(20*mm, y, f"Abrechnung – {ev_label}")
         y -= 12*mm
         c.setFont("Helvetica", 11)
-        for _,r in df.iterrows():
-            c.drawString(20*mm, y, f"{r['Kategorie']}: {r['Summe (€)']:.2f} €")
+        for kat, summe in df[["Kategorie", "Summe (€)"]].itertuples(index=False, name=None):
+            c.drawString(20*mm, y, f"{kat}: {summe:.2f} €")
             y -= 8*mm
             if y < 20*mm:
                 c.showPage(); y = h - 20*mm; c.setFont("Helvetica", 11)
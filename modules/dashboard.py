@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
 import datetime as dt
-import plotly.express as px
 
 from core.db import conn
 from core.ui_theme import page_header, section_title, metric_card
@@ -59,6 +58,47 @@ def _seed_example_rows():
         cn.commit()
 
 
+# ----------------------------
+# Diagramme (gecacht nach Eingabewerten)
+# ----------------------------
+# cache_resource statt cache_data: die Figure wird nur gelesen (st.plotly_chart arbeitet
+# auf einer dict-Kopie), so entfällt das Pickle/Unpickle samt Re-Validierung pro Rerun
+@st.cache_resource(ttl=60, max_entries=16, show_spinner=False)
+def _revenue_line_figure(dates: tuple, values: tuple):
+    import plotly.express as px  # erst laden, wenn wirklich Diagramme gezeichnet werden
+    fig = px.line(x=list(dates), y=list(values), markers=True, line_shape="spline",
+                  color_discrete_sequence=["#00C853"])
+    fig.update_layout(
+        showlegend=False,
+        xaxis_title="Datum",
+        yaxis_title="Tagesumsatz (€)",
+        template="plotly_dark",
+        height=350,
+        margin=dict(l=30, r=30, t=40, b=30)
+    )
+    return fig
+
+
+@st.cache_resource(ttl=60, max_entries=16, show_spinner=False)
+def _sum_bar_figure(labels: tuple, values: tuple, x_title: str, color_scale: str):
+    import plotly.express as px
+    fig = px.bar(
+        x=list(labels),
+        y=list(values),
+        text=[f"{v:,.0f}€" for v in values],
+        color=list(values),
+        color_continuous_scale=color_scale
+    )
+    fig.update_traces(textposition="outside")
+    fig.update_layout(
+        xaxis_title=x_title,
+        yaxis_title="Umsatz (€)",
+        template="plotly_dark",
+        height=380
+    )
+    return fig
+
+
 # ----------------------------
 # Dashboard Rendering
 # ----------------------------
@@ -97,57 +137,34 @@ def render_dashboard():
     # Umsatz-Zeitreihe
     if "datum" in df.columns and "umsatz_total" in df.columns:
         section_title("Umsatzentwicklung (pro Tag)")
-        fig = px.line(df, x="datum", y="umsatz_total", markers=True, line_shape="spline",
-                      color_discrete_sequence=["#00C853"])
-        fig.update_layout(
-            showlegend=False,
-            xaxis_title="Datum",
-            yaxis_title="Tagesumsatz (€)",
-            template="plotly_dark",
-            height=350,
-            margin=dict(l=30, r=30, t=40, b=30)
+        fig = _revenue_line_figure(
+            tuple(df["datum"].dt.strftime("%Y-%m-%d")),
+            tuple(float(v) for v in df["umsatz_total"].fillna(0)),
         )
         st.plotly_chart(fig, use_container_width=True)
 
-    # Bar-Summen
+    # Aufteilungs-Diagramme nur auf Wunsch bauen und ausliefern
     bar_cols = [c for c in df.columns if c.startswith("bar")]
-    if bar_cols:
+    k_cols = [c for c in df.columns if c.startswith("kasse")]
+    show_splits = (bar_cols or k_cols) and st.toggle(
+        "Aufteilung nach Bars & Kassen anzeigen", value=False, key="dash_show_splits"
+    )
+
+    # Bar-Summen
+    if show_splits and bar_cols:
         section_title("Aufteilung nach Bars (Gesamtumsatz)")
         sums = df[bar_cols].sum(numeric_only=True)
-        fig_bar = px.bar(
-            x=sums.index,
-            y=sums.values,
-            text=[f"{v:,.0f}€" for v in sums.values],
-            color=sums.values,
-            color_continuous_scale="tealgrn"
-        )
-        fig_bar.update_traces(textposition="outside")
-        fig_bar.update_layout(
-            xaxis_title="Bar",
-            yaxis_title="Umsatz (€)",
-            template="plotly_dark",
-            height=380
+        fig_bar = _sum_bar_figure(
+            tuple(sums.index), tuple(float(v) for v in sums.values), "Bar", "tealgrn"
         )
         st.plotly_chart(fig_bar, use_container_width=True)
 
     # Kassen-Summen
-    k_cols = [c for c in df.columns if c.startswith("kasse")]
-    if k_cols:
+    if show_splits and k_cols:
         section_title("Kassenumsätze (Cash / Karte)")
         sums_k = df[k_cols].sum(numeric_only=True)
-        fig_k = px.bar(
-            x=sums_k.index,
-            y=sums_k.values,
-            text=[f"{v:,.0f}€" for v in sums_k.values],
-            color=sums_k.values,
-            color_continuous_scale="darkmint"
-        )
-        fig_k.update_traces(textposition="outside")
-        fig_k.update_layout(
-            xaxis_title="Kassa",
-            yaxis_title="Umsatz (€)",
-            template="plotly_dark",
-            height=380
+        fig_k = _sum_bar_figure(
+            tuple(sums_k.index), tuple(float(v) for v in sums_k.values), "Kassa", "darkmint"
         )
         st.plotly_chart(fig_k, use_container_width=True)
 
@@ -3,6 +3,7 @@ import streamlit as st
 import pandas as pd
 import re
 import json
+import sqlite3
 import datetime
 from typing import Optional, Dict, List, Tuple
 
@@ -96,7 +97,7 @@ def _ensure_items_table():
             value TEXT
         )
         """)
-        have = c.execute("SELECT value FROM meta WHERE key='item_categories'").fetchone()
+        have = c.execute("SELECT value FROM meta WHERE key=?", ("item_categories",)).fetchone()
         if not have:
             default = [
                 {"name": "Alkoholfrei", "keywords": ["cola","fanta","sprite","wasser","soda","saft","energydrink","juice","tonic"]},
@@ -114,7 +115,7 @@ def _ensure_items_table():
 def _get_categories() -> List[Dict]:
     with conn() as cn:
         c = cn.cursor()
-        row = c.execute("SELECT value FROM meta WHERE key='item_categories'").fetchone()
+        row = c.execute("SELECT value FROM meta WHERE key=?", ("item_categories",)).fetchone()
         if not row or not row[0]:
             return []
         try:
@@ -274,7 +275,8 @@ def _step_upload_and_map():
 def _clean_dataframe(df: pd.DataFrame, mapping: Dict[str, Optional[str]]) -> pd.DataFrame:
     cats = _get_categories()
     out_rows = []
-    for _, row in df.iterrows():
+    # to_dict("records") statt iterrows: keine Series pro Zeile, Zugriff per Spaltenname bleibt
+    for row in df.to_dict("records"):
         raw_name = str(row[mapping["name"]]) if mapping["name"] else ""
         if not raw_name or str(raw_name).strip() == "":
             continue
@@ -422,11 +424,11 @@ def _render_categories_admin():
 
     if st.button("💾 Kategorien speichern", use_container_width=True):
         new_cats: List[Dict] = []
-        for _, row in edited.iterrows():
-            name = (row.get("Kategorie") or "").strip()
+        for name, kw_raw in edited[["Kategorie", "Keywords (kommagetrennt)"]].itertuples(index=False, name=None):
+            name = name.strip() if isinstance(name, str) else ""
             if not name:
                 continue
-            kw_raw = (row.get("Keywords (kommagetrennt)") or "").strip()
+            kw_raw = kw_raw.strip() if isinstance(kw_raw, str) else ""
             kws = [k.strip() for k in kw_raw.split(",") if k.strip()]
             new_cats.append({"name": name, "keywords": kws})
         _save_categories(new_cats)
@@ -483,6 +485,54 @@ def _upsert_single_item(item: Dict):
             )
         cn.commit()
 
+_ITEM_EDIT_COLS = ["name", "unit_amount", "unit", "stock_qty", "purchase_price", "category"]
+
+def _item_values(name, ua, un, sq, pp, cat) -> Tuple:
+    """Normalisierte Editor-Werte (für Vergleich und Speichern)."""
+    name = name.strip() if isinstance(name, str) else ""
+    un = un.strip() if isinstance(un, str) else ""
+    cat = (cat.strip() or None) if isinstance(cat, str) else None
+    return (name, _f(ua, 0.0), un, _f(sq, 0.0), _f(pp, 0.0), cat)
+
+def _update_items(rows: List[Tuple]):
+    """Batch-Update per ID; rows = (name, unit_amount, unit, stock_qty, purchase_price, category, id).
+
+    Kollidiert eine Zeile mit (name, unit_amount, unit) eines anderen Artikels,
+    wird nichts gespeichert und ein ValueError mit den betroffenen Artikeln geworfen.
+    """
+    if not rows:
+        return
+    with conn() as cn:
+        c = cn.cursor()
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            c.executemany(
+                "UPDATE items SET name=?, unit_amount=?, unit=?, stock_qty=?, purchase_price=?, category=? WHERE id=?",
+                rows,
+            )
+        except sqlite3.IntegrityError:
+            cn.rollback()
+            clashes = _item_key_clashes(c, rows)
+            raise ValueError(
+                "Artikel existiert bereits (Name + Menge + Einheit): " + (", ".join(clashes) or "unbekannt")
+            ) from None
+        cn.commit()
+
+def _item_key_clashes(c, rows: List[Tuple]) -> List[str]:
+    """Beschreibungen der Zeilen, deren neuer Schlüssel schon vergeben ist (DB oder Batch)."""
+    clashes: List[str] = []
+    seen: Dict[Tuple, int] = {}
+    for name, ua, un, _sq, _pp, _cat, item_id in rows:
+        key = (name, ua, un)
+        other = c.execute(
+            "SELECT id FROM items WHERE name=? AND unit_amount=? AND unit=? AND id<>?",
+            key + (item_id,),
+        ).fetchone()
+        if other or key in seen:
+            clashes.append(f"{name} {ua:g} {un}".strip())
+        seen.setdefault(key, item_id)
+    return clashes
+
 def _delete_items(ids: List[int]):
     if not ids:
         return
@@ -571,25 +621,37 @@ def _render_items_admin():
         # Änderungen speichern
         if col_save.button("💾 Änderungen speichern", type="primary", use_container_width=True):
             try:
-                # Für jede Zeile upserten (Upsert auf Name+Menge+Einheit – wie bisher)
-                for idx, row in edited.iterrows():
-                    _upsert_single_item({
-                        "name": row.get("name"),
-                        "unit_amount": row.get("unit_amount"),
-                        "unit": row.get("unit"),
-                        "stock_qty": row.get("stock_qty"),
-                        "purchase_price": row.get("purchase_price"),
-                        "category": row.get("category") or None,
-                    })
-                st.success("Änderungen gespeichert.")
-                st.rerun()
+                # Nur geänderte Zeilen schreiben: bestehende per ID (executemany),
+                # neue Zeilen per Upsert (Name+Menge+Einheit)
+                orig = {
+                    int(i): _item_values(*vals)
+                    for i, *vals in work[_ITEM_EDIT_COLS].itertuples(name=None)
+                }
+                updates: List[Tuple] = []
+                new_rows: List[Dict] = []
+                for item_id, *vals in edited[_ITEM_EDIT_COLS].itertuples(name=None):
+                    vals = _item_values(*vals)
+                    if not vals[0]:
+                        continue
+                    if pd.isna(item_id):
+                        new_rows.append(dict(zip(_ITEM_EDIT_COLS, vals)))
+                    elif orig.get(int(item_id)) != vals:
+                        updates.append(vals + (int(item_id),))
+                if not updates and not new_rows:
+                    st.info("Keine Änderungen.")
+                else:
+                    _update_items(updates)
+                    _upsert_items(new_rows)
+                    st.success("Änderungen gespeichert.")
+                    st.rerun()
             except Exception as e:
                 st.error(f"Fehler beim Speichern: {e}")
 
         # Markierte löschen
         if col_del.button("🗑️ Markierte löschen", use_container_width=True):
             try:
-                to_delete_ids = [int(i) for i, r in edited.iterrows() if bool(r.get("delete"))]
+                marked = edited["delete"].fillna(False).astype(bool)
+                to_delete_ids = [int(i) for i in edited.index[marked] if pd.notna(i)]
                 if not to_delete_ids:
                     st.info("Keine Artikel markiert.")
                 else:
@@ -630,27 +692,23 @@ def _render_items_admin():
             st.error(f"Fehler beim Speichern: {e}")
 # ====================== Inventuren verwalten (Admin) ======================
 
+_STATUS_LABELS = {
+    "approved": "Freigegeben",
+    "submitted": "Eingereicht",
+    "editing": "In Bearbeitung",
+}
+_BADGE_STYLE = (
+    "padding:2px 8px;"
+    "border-radius:999px;"
+    "border:1px solid rgba(148,163,184,0.6);"
+    "font-size:0.7rem;"
+    "opacity:0.9;"
+)
+
 def _status_badge(status: str) -> str:
     status = (status or "editing").lower()
-    if status == "approved":
-        label = "Freigegeben"
-    elif status == "submitted":
-        label = "Eingereicht"
-    elif status == "editing":
-        label = "In Bearbeitung"
-    else:
-        label = status.capitalize()
-    return (
-        "<span style='"
-        "padding:2px 8px;"
-        "border-radius:999px;"
-        "border:1px solid rgba(148,163,184,0.6);"
-        "font-size:0.7rem;"
-        "opacity:0.9;"
-        "'>"
-        f"{label}"
-        "</span>"
-    )
+    label = _STATUS_LABELS.get(status) or status.capitalize()
+    return f"<span style='{_BADGE_STYLE}'>{label}</span>"
 
 def _render_inventuren_admin():
     section_title("📋 Inventuren verwalten")
@@ -679,146 +737,155 @@ def _render_inventuren_admin():
     else:
         inv_list = all_inv
 
+    if not inv_list:
+        st.info("Keine erledigten Inventuren vorhanden.")
+        return
+
     username = st.session_state.get("username", "admin")
 
-    for inv in inv_list:
-        inv_id = inv["id"]
-        year = inv["year"]
-        month = inv["month"]
-        status = (inv.get("status") or "editing").lower()
-        total = invdb.get_inventur_total_value(inv_id)
-
-        month_label = datetime.date(year, month, 1).strftime("%b %Y")
-
-        box = st.container(border=True)
-        header_cols = box.columns([3, 2, 2])
-
-        # Titel + Status
-        with header_cols[0]:
-            st.markdown(f"**{month_label}**")
-            st.markdown(_status_badge(status), unsafe_allow_html=True)
-
-        # Meta / Zeiten
-        with header_cols[1]:
-            st.caption(f"Wert gesamt: **{total:,.2f} €**")
-            if inv.get("submitted_at"):
-                st.caption(f"Eingereicht: {inv['submitted_at']}")
-            if inv.get("approved_at"):
-                st.caption(f"Freigegeben: {inv['approved_at']}")
-
-        # Aktionen
-        with header_cols[2]:
-            bcols = st.columns(3)
-
-            # Löschen (nur wenn nicht freigegeben)
-            can_delete = status != "approved"
-            if bcols[0].button(
-                "🗑️ Löschen",
-                key=f"inv_del_{inv_id}",
+    def _label(inv: Dict) -> str:
+        return datetime.date(inv["year"], inv["month"], 1).strftime("%b %Y")
+
+    # Übersicht als eine Tabelle (ein Element statt Spalten/Buttons pro Inventur)
+    rows_html = "".join(
+        "<tr>"
+        f"<td><b>{_label(inv)}</b></td>"
+        f"<td>{_status_badge(inv.get('status'))}</td>"
+        f"<td style='text-align:right'>{inv['total_value']:,.2f} €</td>"
+        f"<td>{inv.get('submitted_at') or '—'}</td>"
+        f"<td>{inv.get('approved_at') or '—'}</td>"
+        "</tr>"
+        for inv in inv_list
+    )
+    st.markdown(
+        "<table style='width:100%;font-size:0.85rem'>"
+        "<thead><tr><th>Monat</th><th>Status</th><th style='text-align:right'>Wert gesamt</th>"
+        "<th>Eingereicht</th><th>Freigegeben</th></tr></thead>"
+        f"<tbody>{rows_html}</tbody></table>",
+        unsafe_allow_html=True,
+    )
+
+    # Aktionen nur für die ausgewählte Inventur
+    by_id = {inv["id"]: inv for inv in inv_list}
+    inv_id = st.selectbox(
+        "Inventur auswählen",
+        list(by_id.keys()),
+        format_func=lambda i: _label(by_id[i]),
+        key="inv_admin_sel",
+    )
+    inv = by_id[inv_id]
+    status = (inv.get("status") or "editing").lower()
+    month_label = _label(inv)
+
+    bcols = st.columns(3)
+
+    # Löschen (nur wenn nicht freigegeben)
+    can_delete = status != "approved"
+    if bcols[0].button(
+        "🗑️ Löschen",
+        key=f"inv_del_{inv_id}",
+        use_container_width=True,
+        disabled=not can_delete,
+    ):
+        invdb.delete_inventur(inv_id, username)
+        st.success(f"Inventur {month_label} wurde gelöscht.")
+        st.rerun()
+
+    # Freigeben
+    can_approve = status in ("submitted", "editing")
+    if bcols[1].button(
+        "🔓 Freigeben",
+        key=f"inv_app_{inv_id}",
+        use_container_width=True,
+        disabled=not can_approve,
+    ):
+        df_items = invdb.load_inventur_items_df(inv_id)
+        invdb.save_inventur_counts(inv_id, df_items, username, submit=True)
+        invdb.approve_inventur(inv_id, username)
+        st.success(f"Inventur {month_label} wurde freigegeben.")
+        st.rerun()
+
+    # Bearbeiten / Details (nur die ausgewählte Inventur wird geladen)
+    with st.expander("Bearbeiten / Details ansehen", expanded=False):
+        df_items = invdb.load_inventur_items_df(inv_id)
+        if df_items.empty:
+            st.caption(
+                "Keine Artikel in dieser Inventur. Prüfe bitte den Artikelstamm."
+            )
+        else:
+            df_display = df_items.copy()
+            st.caption(
+                "Du kannst hier die gezählten Mengen und Einkaufspreise anpassen. "
+                "Änderungen gelten nur für diese Inventur."
+            )
+
+            edited_df = st.data_editor(
+                df_display,
+                column_order=[
+                    "item_name",
+                    "counted_qty",
+                    "purchase_price",
+                    "total_value",
+                ],
+                column_config={
+                    "item_name": st.column_config.TextColumn(
+                        "Artikel", disabled=True
+                    ),
+                    "counted_qty": st.column_config.NumberColumn(
+                        "Gezählt", step=0.1
+                    ),
+                    "purchase_price": st.column_config.NumberColumn(
+                        "EK-Preis (€)", format="%.2f"
+                    ),
+                    "total_value": st.column_config.NumberColumn(
+                        "Wert (€)", disabled=True, format="%.2f"
+                    ),
+                },
                 use_container_width=True,
-                disabled=not can_delete,
-            ):
-                invdb.delete_inventur(inv_id, username)
-                st.success(f"Inventur {month_label} wurde gelöscht.")
-                st.rerun()
+                key=f"inv_edit_{inv_id}",
+            )
+
+            btn_cols = st.columns(3)
 
-            # Freigeben
-            can_approve = status in ("submitted", "editing")
-            if bcols[1].button(
-                "🔓 Freigeben",
-                key=f"inv_app_{inv_id}",
+            # Zwischenspeichern
+            if btn_cols[0].button(
+                "💾 Zwischenspeichern",
+                key=f"inv_save_{inv_id}",
                 use_container_width=True,
-                disabled=not can_approve,
             ):
-                df_items = invdb.load_inventur_items_df(inv_id)
-                invdb.save_inventur_counts(inv_id, df_items, username, submit=True)
-                invdb.approve_inventur(inv_id, username)
-                st.success(f"Inventur {month_label} wurde freigegeben.")
+                invdb.save_inventur_counts(
+                    inv_id, edited_df, username, submit=False
+                )
+                st.success("Inventur wurde gespeichert.")
                 st.rerun()
 
-            # Platzhalter für Layout
-            bcols[2].markdown("")
-
-        # Bearbeiten / Details
-        with box.expander("Bearbeiten / Details ansehen", expanded=False):
-            df_items = invdb.load_inventur_items_df(inv_id)
-            if df_items.empty:
-                st.caption(
-                    "Keine Artikel in dieser Inventur. Prüfe bitte den Artikelstamm."
+            # Einreichen
+            if btn_cols[1].button(
+                "📨 Einreichen",
+                key=f"inv_submit_{inv_id}",
+                use_container_width=True,
+            ):
+                invdb.save_inventur_counts(
+                    inv_id, edited_df, username, submit=True
                 )
-            else:
-                df_display = df_items.copy()
-                st.caption(
-                    "Du kannst hier die gezählten Mengen und Einkaufspreise anpassen. "
-                    "Änderungen gelten nur für diese Inventur."
+                st.success(
+                    "Inventur wurde eingereicht. Sie kann jetzt freigegeben werden."
                 )
+                st.rerun()
 
-                edited_df = st.data_editor(
-                    df_display,
-                    column_order=[
-                        "item_name",
-                        "counted_qty",
-                        "purchase_price",
-                        "total_value",
-                    ],
-                    column_config={
-                        "item_name": st.column_config.TextColumn(
-                            "Artikel", disabled=True
-                        ),
-                        "counted_qty": st.column_config.NumberColumn(
-                            "Gezählt", step=0.1
-                        ),
-                        "purchase_price": st.column_config.NumberColumn(
-                            "EK-Preis (€)", format="%.2f"
-                        ),
-                        "total_value": st.column_config.NumberColumn(
-                            "Wert (€)", disabled=True, format="%.2f"
-                        ),
-                    },
-                    use_container_width=True,
-                    key=f"inv_edit_{inv_id}",
+            # Speichern & freigeben
+            if btn_cols[2].button(
+                "🔓 Speichern & freigeben",
+                key=f"inv_submit_app_{inv_id}",
+                use_container_width=True,
+            ):
+                invdb.save_inventur_counts(
+                    inv_id, edited_df, username, submit=True
                 )
+                invdb.approve_inventur(inv_id, username)
+                st.success("Inventur wurde gespeichert und freigegeben.")
+                st.rerun()
 
-                btn_cols = st.columns(3)
-
-                # Zwischenspeichern
-                if btn_cols[0].button(
-                    "💾 Zwischenspeichern",
-                    key=f"inv_save_{inv_id}",
-                    use_container_width=True,
-                ):
-                    invdb.save_inventur_counts(
-                        inv_id, edited_df, username, submit=False
-                    )
-                    st.success("Inventur wurde gespeichert.")
-                    st.rerun()
-
-                # Einreichen
-                if btn_cols[1].button(
-                    "📨 Einreichen",
-                    key=f"inv_submit_{inv_id}",
-                    use_container_width=True,
-                ):
-                    invdb.save_inventur_counts(
-                        inv_id, edited_df, username, submit=True
-                    )
-                    st.success(
-                        "Inventur wurde eingereicht. Sie kann jetzt freigegeben werden."
-                    )
-                    st.rerun()
-
-                # Speichern & freigeben
-                if btn_cols[2].button(
-                    "🔓 Speichern & freigeben",
-                    key=f"inv_submit_app_{inv_id}",
-                    use_container_width=True,
-                ):
-                    invdb.save_inventur_counts(
-                        inv_id, edited_df, username, submit=True
-                    )
-                    invdb.approve_inventur(inv_id, username)
-                    st.success("Inventur wurde gespeichert und freigegeben.")
-                    st.rerun()
 # ====================== Öffentliche Render-Funktion ======================
 
 def render_data_tools():
@@ -1,7 +1,7 @@
 # modules/inventur.py
 import calendar
 import datetime
-from typing import List
+from typing import List, Optional
 
 import streamlit as st
 
@@ -35,137 +35,141 @@ def _has_inventur_right(role: str, scope: str) -> bool:
 # ---------------------------------------------------------
 # UI-Styles
 # ---------------------------------------------------------
+# Einmal beim Import gebaut (Einrückung entfernt), pro Rerun nur noch ausgeliefert
+_INV_CSS = """
+<style>
+/* === Streamlit-Deko / Pille killen (wie im Login) =================== */
+[data-testid="stDecoration"],
+[data-testid="stStatusWidget"],
+[data-testid="stCloudAppStatus"],
+header [data-testid="stToolbar"],
+header [data-testid="stHeaderActionButtons"],
+header [data-testid="stActionButton"],
+.stDeployButton,
+.viewerBadge_container__r3R7,
+button[title="Manage app"],
+button[title="View source"],
+/* Fallback: gradient-Pille mit riesigem border-radius */
+div[style*="linear-gradient"][style*="999px"],
+div[style*="linear-gradient"][style*="border-radius: 999px"],
+div[style*="linear-gradient"][style*="border-radius:999px"] {
+    display: none !important;
+}
+
+.inv-hero {
+    text-align: left;
+    margin-bottom: 24px;
+}
+.inv-title {
+    font-size: 1.6rem;
+    font-weight: 700;
+    color: #f9fafb;
+    margin-bottom: 4px;
+}
+.inv-sub {
+    font-size: .9rem;
+    color: #e5e7eb;
+    opacity: .8;
+    margin-bottom: 2px;
+}
+.inv-mini {
+    font-size: .78rem;
+    color: #9ca3af;
+    opacity: .8;
+}
+
+.inv-card {
+    border-radius: 18px;
+    padding: 18px 18px 14px 18px;
+    background: radial-gradient(400px 220px at 0% 0%, rgba(56,189,248,0.18), transparent),
+                radial-gradient(600px 260px at 120% 0%, rgba(56,189,248,0.06), transparent),
+                rgba(15,23,42,0.96);
+    box-shadow: 0 18px 45px rgba(0,0,0,0.55);
+    border: 1px solid rgba(148,163,184,0.35);
+}
+
+.inv-badge {
+    display: inline-block;
+    padding: 2px 8px;
+    border-radius: 999px;
+    font-size: 0.75rem;
+    border: 1px solid rgba(148,163,184,0.45);
+    color: #e5e7eb;
+    background: rgba(15,23,42,0.8);
+    margin-bottom: 8px;
+}
+
+.inv-status-pill {
+    display: inline-block;
+    padding: 2px 8px;
+    border-radius: 999px;
+    font-size: 0.75rem;
+    font-weight: 500;
+}
+.inv-status-open {
+    background: rgba(59,130,246,0.15);
+    color: #bfdbfe;
+    border: 1px solid rgba(59,130,246,0.55);
+}
+.inv-status-submitted {
+    background: rgba(245,158,11,0.15);
+    color: #fed7aa;
+    border: 1px solid rgba(245,158,11,0.55);
+}
+.inv-status-approved {
+    background: rgba(22,163,74,0.18);
+    color: #bbf7d0;
+    border: 1px solid rgba(22,163,74,0.55);
+}
+.inv-status-overdue {
+    background: rgba(239,68,68,0.15);
+    color: #fecaca;
+    border: 1px solid rgba(239,68,68,0.6);
+}
+
+.inv-history-card {
+    border-radius: 14px;
+    padding: 10px 12px;
+    margin-bottom: 8px;
+    background: rgba(15,23,42,0.85);
+    border: 1px solid rgba(55,65,81,0.8);
+}
+.inv-history-header {
+    display:flex;
+    justify-content:space-between;
+    align-items:center;
+    font-size:0.9rem;
+    margin-bottom:2px;
+}
+.inv-history-meta {
+    font-size:0.78rem;
+    opacity:.75;
+}
+</style>
+""".strip()
+
+
 def _inject_styles():
-    st.markdown(
-        """
-        <style>
-        /* === Streamlit-Deko / Pille killen (wie im Login) =================== */
-        [data-testid="stDecoration"],
-        [data-testid="stStatusWidget"],
-        [data-testid="stCloudAppStatus"],
-        header [data-testid="stToolbar"],
-        header [data-testid="stHeaderActionButtons"],
-        header [data-testid="stActionButton"],
-        .stDeployButton,
-        .viewerBadge_container__r3R7,
-        button[title="Manage app"],
-        button[title="View source"],
-        /* Fallback: gradient-Pille mit riesigem border-radius */
-        div[style*="linear-gradient"][style*="999px"],
-        div[style*="linear-gradient"][style*="border-radius: 999px"],
-        div[style*="linear-gradient"][style*="border-radius:999px"] {
-            display: none !important;
-        }
-
-        .inv-hero {
-            text-align: left;
-            margin-bottom: 24px;
-        }
-        .inv-title {
-            font-size: 1.6rem;
-            font-weight: 700;
-            color: #f9fafb;
-            margin-bottom: 4px;
-        }
-        .inv-sub {
-            font-size: .9rem;
-            color: #e5e7eb;
-            opacity: .8;
-            margin-bottom: 2px;
-        }
-        .inv-mini {
-            font-size: .78rem;
-            color: #9ca3af;
-            opacity: .8;
-        }
-
-        .inv-card {
-            border-radius: 18px;
-            padding: 18px 18px 14px 18px;
-            background: radial-gradient(400px 220px at 0% 0%, rgba(56,189,248,0.18), transparent),
-                        radial-gradient(600px 260px at 120% 0%, rgba(56,189,248,0.06), transparent),
-                        rgba(15,23,42,0.96);
-            box-shadow: 0 18px 45px rgba(0,0,0,0.55);
-            border: 1px solid rgba(148,163,184,0.35);
-        }
-
-        .inv-badge {
-            display: inline-block;
-            padding: 2px 8px;
-            border-radius: 999px;
-            font-size: 0.75rem;
-            border: 1px solid rgba(148,163,184,0.45);
-            color: #e5e7eb;
-            background: rgba(15,23,42,0.8);
-            margin-bottom: 8px;
-        }
-
-        .inv-status-pill {
-            display: inline-block;
-            padding: 2px 8px;
-            border-radius: 999px;
-            font-size: 0.75rem;
-            font-weight: 500;
-        }
-        .inv-status-open {
-            background: rgba(59,130,246,0.15);
-            color: #bfdbfe;
-            border: 1px solid rgba(59,130,246,0.55);
-        }
-        .inv-status-submitted {
-            background: rgba(245,158,11,0.15);
-            color: #fed7aa;
-            border: 1px solid rgba(245,158,11,0.55);
-        }
-        .inv-status-approved {
-            background: rgba(22,163,74,0.18);
-            color: #bbf7d0;
-            border: 1px solid rgba(22,163,74,0.55);
-        }
-        .inv-status-overdue {
-            background: rgba(239,68,68,0.15);
-            color: #fecaca;
-            border: 1px solid rgba(239,68,68,0.6);
-        }
-
-        .inv-history-card {
-            border-radius: 14px;
-            padding: 10px 12px;
-            margin-bottom: 8px;
-            background: rgba(15,23,42,0.85);
-            border: 1px solid rgba(55,65,81,0.8);
-        }
-        .inv-history-header {
-            display:flex;
-            justify-content:space-between;
-            align-items:center;
-            font-size:0.9rem;
-            margin-bottom:2px;
-        }
-        .inv-history-meta {
-            font-size:0.78rem;
-            opacity:.75;
-        }
-        </style>
-        """,
-        unsafe_allow_html=True,
+    # muss bei jedem Rerun erneut gesendet werden, sonst entfernt Streamlit den Block
+    st.markdown(_INV_CSS, unsafe_allow_html=True)
+
+# Fertige Pill-HTMLs (einmal beim Import gebaut)
+_STATUS_PILLS = {
+    key: f"<span class='inv-status-pill {cls}'>{label}</span>"
+    for key, cls, label in (
+        ("approved", "inv-status-approved", "Freigegeben"),
+        ("submitted", "inv-status-submitted", "Zur Freigabe eingereicht"),
+        ("overdue", "inv-status-overdue", "Überfällig"),
+        ("open", "inv-status-open", "In Bearbeitung"),
     )
+}
 
-def _status_pill(status: str, year: int, month: int) -> str:
-    today = datetime.date.today()
+def _status_pill(status: str, year: int, month: int, today: Optional[datetime.date] = None) -> str:
     s = (status or "editing").lower()
-    overdue = (year < today.year) or (year == today.year and month < today.month)
-
-    if s == "approved":
-        cls, label = "inv-status-approved", "Freigegeben"
-    elif s == "submitted":
-        cls, label = "inv-status-submitted", "Zur Freigabe eingereicht"
-    elif overdue:
-        cls, label = "inv-status-overdue", "Überfällig"
-    else:
-        cls, label = "inv-status-open", "In Bearbeitung"
-
-    return f"<span class='inv-status-pill {cls}'>{label}</span>"
+    if s == "approved" or s == "submitted":
+        return _STATUS_PILLS[s]
+    today = today or datetime.date.today()
+    return _STATUS_PILLS["overdue" if (year, month) < (today.year, today.month) else "open"]
 
 
 # ---------------------------------------------------------
@@ -212,6 +216,7 @@ def _render_current_inventur(username: str, is_reviewer: bool):
             current_inv["status"],
             current_inv["year"],
             current_inv["month"],
+            today,
         )
 
         top_left, top_right = st.columns([3, 1])
@@ -320,15 +325,15 @@ def _render_history():
         status = (inv["status"] or "editing").lower()
         month_label = calendar.month_abbr[month]
 
-        total = invdb.get_inventur_total_value(inv["id"])
+        total = inv["total_value"]
 
-        overdue = (year < today.year) or (year == today.year and month < today.month)
+        overdue = inv["overdue"]
         if status == "approved":
-            pill_html = _status_pill(status, year, month)
+            pill_html = _status_pill(status, year, month, today)
         elif overdue:
-            pill_html = _status_pill("overdue", year, month)
+            pill_html = _status_pill("overdue", year, month, today)
         else:
-            pill_html = _status_pill(status, year, month)
+            pill_html = _status_pill(status, year, month, today)
 
         st.markdown(
             f"""
@@ -132,7 +132,7 @@ def get_business_name() -> str:
         with conn() as cn:
             c = cn.cursor()
             row = c.execute(
-                "SELECT value FROM meta WHERE key='business_name'"
+                "SELECT value FROM meta WHERE key=?", ("business_name",)
             ).fetchone()
         if row and (row[0] or "").strip():
             return row[0].strip()
@@ -285,27 +285,29 @@ def save_inventur_counts(
     ensure_inventur_schema()
     now = datetime.datetime.now().isoformat(timespec="seconds")
 
+    rows = []
+    for item_id, qty, price in df[["item_id", "counted_qty", "purchase_price"]].itertuples(index=False, name=None):
+        qty = float(qty) if pd.notna(qty) else 0.0
+        price = float(price) if pd.notna(price) else 0.0
+        rows.append((qty, price, qty * price, now, username, inv_id, int(item_id)))
+
     with conn() as cn:
         c = cn.cursor()
+        c.execute("BEGIN IMMEDIATE")
 
-        for _, row in df.iterrows():
-            item_id = int(row["item_id"])
-            qty = float(row.get("counted_qty", 0) or 0)
-            price = float(row.get("purchase_price", 0) or 0)
-            total = qty * price
-
-            c.execute(
-                """
-                UPDATE inv_items
-                   SET counted_qty=?,
-                       purchase_price=?,
-                       total_value=?,
-                       updated_at=?,
-                       updated_by=?
-                 WHERE inv_id=? AND item_id=?
-                """,
-                (qty, price, total, now, username, inv_id, item_id),
-            )
+        c.executemany(
+            """
+            UPDATE inv_items
+               SET counted_qty=?,
+                   purchase_price=?,
+                   total_value=?,
+                   updated_at=?,
+                   updated_by=?
+             WHERE inv_id=? AND item_id=?
+               AND (counted_qty IS NOT ? OR purchase_price IS NOT ?)
+            """,
+            [r + (r[0], r[1]) for r in rows],
+        )
 
         if submit:
             c.execute(
@@ -319,7 +321,6 @@ def save_inventur_counts(
                 """,
                 (now, username, now, inv_id),
             )
-            log_audit(username, "inventur_submit", f"inv_id={inv_id}")
         else:
             c.execute(
                 """
@@ -330,10 +331,12 @@ def save_inventur_counts(
                 """,
                 (now, inv_id),
             )
-            log_audit(username, "inventur_save", f"inv_id={inv_id}")
 
         cn.commit()
 
+    # Audit erst nach dem Commit: log_audit schreibt über eine eigene Verbindung
+    log_audit(username, "inventur_submit" if submit else "inventur_save", f"inv_id={inv_id}")
+
 def approve_inventur(inv_id: int, username: str) -> None:
     ensure_inventur_schema()
     now = datetime.datetime.now().isoformat(timespec="seconds")
@@ -354,39 +357,39 @@ def approve_inventur(inv_id: int, username: str) -> None:
     log_audit(username, "inventur_approve", f"inv_id={inv_id}")
 
 def list_all_inventuren() -> List[Dict]:
+    """
+    Alle Inventuren inkl. Gesamtwert und Überfällig-Flag
+    in einer Abfrage (statt einer Summen-Abfrage pro Inventur).
+    """
     ensure_inventur_schema()
+    today = datetime.date.today()
     with conn() as cn:
         c = cn.cursor()
         rows = c.execute(
             """
-            SELECT id, year, month, status,
-                   created_at, submitted_at, approved_at
-              FROM inv_months
-             ORDER BY year DESC, month DESC
-            """
+            SELECT m.id, m.year, m.month, m.status,
+                   m.created_at, m.submitted_at, m.approved_at,
+                   COALESCE(SUM(i.total_value), 0) AS total_value,
+                   CASE WHEN m.year < ? OR (m.year = ? AND m.month < ?) THEN 1 ELSE 0 END AS overdue
+              FROM inv_months m
+              LEFT JOIN inv_items i ON i.inv_id = m.id
+             GROUP BY m.id
+             ORDER BY m.year DESC, m.month DESC
+            """,
+            (today.year, today.year, today.month),
         ).fetchall()
 
-    out: List[Dict] = []
-    for r in rows:
-        out.append(
-            {
-                "id": r[0],
-                "year": r[1],
-                "month": r[2],
-                "status": (r[3] or "editing"),
-                "created_at": r[4] or "",
-                "submitted_at": r[5] or "",
-                "approved_at": r[6] or "",
-            }
-        )
-    return out
-
-def get_inventur_total_value(inv_id: int) -> float:
-    ensure_inventur_schema()
-    with conn() as cn:
-        c = cn.cursor()
-        row = c.execute(
-            "SELECT SUM(total_value) FROM inv_items WHERE inv_id=?",
-            (inv_id,),
-        ).fetchone()
-    return float(row[0] or 0.0)
+    return [
+        {
+            "id": r[0],
+            "year": r[1],
+            "month": r[2],
+            "status": (r[3] or "editing"),
+            "created_at": r[4] or "",
+            "submitted_at": r[5] or "",
+            "approved_at": r[6] or "",
+            "total_value": float(r[7] or 0.0),
+            "overdue": bool(r[8]),
+        }
+        for r in rows
+    ]
@@ -205,13 +205,13 @@ def _news_orf():
         if getattr(d, "bozo", 0):
             st.caption("RSS nicht verfügbar.")
             return
+        lines = []
         for entry in (getattr(d, "entries", []) or [])[:5]:
             title = entry.get("title", "ohne Titel")
             link  = entry.get("link", None)
-            if link:
-                st.markdown(f"- [{title}]({link})")
-            else:
-                st.markdown(f"- {title}")
+            lines.append(f"- [{title}]({link})" if link else f"- {title}")
+        if lines:
+            st.markdown("\n".join(lines))
     except Exception:
         st.caption("RSS nicht verfügbar.")
 
@@ -219,26 +219,25 @@ def _news_orf():
 # Entry
 # ------------------------------------------------
 
+_HIDE_DECO_CSS = (
+    "<style>"
+    '[data-testid="stDecoration"],'
+    '[data-testid="stStatusWidget"],'
+    '[data-testid="stCloudAppStatus"],'
+    ".stDeployButton,"
+    ".viewerBadge_container__r3R7,"
+    ".viewerBadge_link__qRIco,"
+    'header [data-testid="stToolbar"],'
+    'header [data-testid="stHeaderActionButtons"],'
+    'header [data-testid="stActionButton"],'
+    'button[title="Manage app"],'
+    'button[title="View source"] { display:none !important; }'
+    "</style>"
+)
+
 def render_start(username: str = "Gast"):
     # Deko/Toolbar/Pillen global ausblenden (kein sichtbares Artefakt über dem Header)
-    st.markdown(
-        """
-        <style>
-        [data-testid="stDecoration"],
-        [data-testid="stStatusWidget"],
-        [data-testid="stCloudAppStatus"],
-        .stDeployButton,
-        .viewerBadge_container__r3R7,
-        .viewerBadge_link__qRIco,
-        header [data-testid="stToolbar"],
-        header [data-testid="stHeaderActionButtons"],
-        header [data-testid="stActionButton"],
-        button[title="Manage app"],
-        button[title="View source"] { display:none !important; }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+    st.markdown(_HIDE_DECO_CSS, unsafe_allow_html=True)
 
     # Header (schlank, ohne Box)
     st.markdown(f"### Willkommen, {username or 'Gast'} 👋")
@@ -305,7 +304,9 @@ def render_start(username: str = "Gast"):
                 if not rows:
                     st.caption("Noch keine Aktivitäten protokolliert.")
                 else:
-                    for ts, user, action, details in rows:
-                        st.markdown(f"- `{ts}` · **{user or '—'}** · *{action}* — {details}")
+                    st.markdown("\n".join(
+                        f"- `{ts}` · **{user or '—'}** · *{action}* — {details}"
+                        for ts, user, action, details in rows
+                    ))
     with right:
         _news_orf()